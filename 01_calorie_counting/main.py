@@ -2,19 +2,34 @@ import fileinput
 import heapq
 
 
-def main():
-    top_sums = [0] * 3
+def find_top_sums(lines, top_num=3):
+    top_sums = [0] * top_num
     cur_sum = 0
 
-    for line in fileinput.input():
-        if line == '\n':
+    for line in lines:
+        if not line.strip():
             heapq.heappushpop(top_sums, cur_sum)
             cur_sum = 0
         else:
             cur_sum += int(line)
+    heapq.heappushpop(top_sums, cur_sum)
+
+    return top_sums
+
+
+def main(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
+    top_sums = find_top_sums(lines)
 
     print(f'sum({top_sums}) = {sum(top_sums)}')
 
 
+def solve(text):
+    top_sums = find_top_sums(text.splitlines())
+    return max(top_sums), sum(top_sums)
+
+
 if __name__ == '__main__':
     main()
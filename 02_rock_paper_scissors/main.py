@@ -6,12 +6,15 @@ DRAW_SCORE = 3
 WIN_SCORE = 6
 
 
-def score_for_given_move():
+def score_for_given_move(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     op_ord_start = ord('A')
     my_ord_start = ord('X')
 
     result = 0
-    for line in fileinput.input():
+    for line in lines:
         op_move, my_move = line.split()
         op_value = ord(op_move) - op_ord_start
         my_value = ord(my_move) - my_ord_start
@@ -27,15 +30,18 @@ def score_for_given_move():
 
         result += score
 
-    print(result)
+    return result
+
 
+def score_for_given_result(lines=None):
+    if lines is None:
+        lines = fileinput.input()
 
-def score_for_given_result():
     op_ord_start = ord('A')
     target_ord_start = ord('X')
 
     result = 0
-    for line in fileinput.input():
+    for line in lines:
         op_move, target = line.split()
         op_value = ord(op_move) - op_ord_start
 
@@ -51,9 +57,14 @@ def score_for_given_result():
 
         result += score
 
-    print(result)
+    return result
+
+
+def solve(text):
+    lines = text.splitlines()
+    return score_for_given_move(lines), score_for_given_result(lines)
 
 
 if __name__ == '__main__':
-    # score_for_given_move()
-    score_for_given_result()
+    # print(score_for_given_move())
+    print(score_for_given_result())
@@ -15,10 +15,13 @@ def find_duplicate(left, right):
             return c
 
 
-def find_rucksack_duplicates():
+def find_rucksack_duplicates(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     result = 0
 
-    for line in fileinput.input():
+    for line in lines:
         half_len = len(line) // 2
         left, right = line[:half_len], line[half_len:]
 
@@ -27,7 +30,7 @@ def find_rucksack_duplicates():
 
         result += priority
 
-    print(result)
+    return result
 
 
 def find_common_element(xs, ys, zs):
@@ -38,10 +41,13 @@ def find_common_element(xs, ys, zs):
     return next(iter(intersection))
 
 
-def find_groups_common_element():
+def find_groups_common_element(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     result = 0
 
-    lines = list(line.strip() for line in fileinput.input())
+    lines = list(line.strip() for line in lines)
     for i in range(0, len(lines), 3):
         sacks = lines[i:i+3]
 
@@ -50,9 +56,14 @@ def find_groups_common_element():
 
         result += priority
 
-    print(result)
+    return result
+
+
+def solve(text):
+    lines = text.splitlines()
+    return find_rucksack_duplicates(lines), find_groups_common_element(lines)
 
 
 if __name__ == '__main__':
-    # find_rucksack_duplicates()
-    find_groups_common_element()
+    # print(find_rucksack_duplicates())
+    print(find_groups_common_element())
@@ -16,10 +16,13 @@ def overlap(a_start, a_end, b_start, b_end):
     return not (a_end < b_start or a_start > b_end)
 
 
-def find_ranges(relation):
+def find_ranges(relation, lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     count = 0
 
-    for line in fileinput.input():
+    for line in lines:
         range_a, range_b = line.split(',')
         a_start, a_end = map(int, range_a.split('-'))
         b_start, b_end = map(int, range_b.split('-'))
@@ -27,9 +30,14 @@ def find_ranges(relation):
         if relation(a_start, a_end, b_start, b_end):
            count += 1
 
-    print(count)
+    return count
+
+
+def solve(text):
+    lines = text.splitlines()
+    return find_ranges(either_contains, lines), find_ranges(overlap, lines)
 
 
 if __name__ == '__main__':
-    #find_ranges(either_contains)
-    find_ranges(overlap)
+    #print(find_ranges(either_contains))
+    print(find_ranges(overlap))
@@ -10,12 +10,15 @@ class Move:
     dst: int
 
 
-def read_input():
-    lines = list(fileinput.input())
+def read_input(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
+    lines = list(lines)
 
     break_line = None
     for i, line in enumerate(lines):
-        if line == '\n':
+        if not line.strip():
             break_line = i
             break
 
@@ -38,16 +41,27 @@ def read_input():
     return stacks, moves
 
 
-def simulate(stacks, moves):
+def simulate(stacks, moves, keep_order=True):
     for move in moves:
         stack_src = stacks[move.src]
         stack_dst = stacks[move.dst]
         size = move.size
         moved = stack_src[-size:]
+        if not keep_order:
+            moved.reverse()
         del stack_src[-size:]
         stack_dst.extend(moved)
 
 
+def solve(text):
+    result = []
+    for keep_order in (False, True):
+        stacks, moves = read_input(text.splitlines())
+        simulate(stacks, moves, keep_order=keep_order)
+        result.append(''.join([stack[-1] for stack in stacks]))
+    return tuple(result)
+
+
 if __name__ == '__main__':
     stacks, moves = read_input()
     print(stacks)
@@ -15,6 +15,14 @@ def find_unique_window(signal, target_size):
             return i + 1
 
 
+def solve(text):
+    line = text.strip()
+    return (
+        find_unique_window(signal=line, target_size=4),
+        find_unique_window(signal=line, target_size=14),
+    )
+
+
 if __name__ == '__main__':
     line = input().strip()
     pos = find_unique_window(signal=line, target_size=4)
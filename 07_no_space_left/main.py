@@ -30,11 +30,14 @@ class File:
         return self.size
 
 
-def build_fs_tree():
+def build_fs_tree(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     root = Directory(name='/', parent=None, children=dict())
     workdir = root
 
-    for line in fileinput.input():
+    for line in lines:
         if line.startswith('$ cd'):
             target = line.split()[2]
             if target == '/':
@@ -74,21 +77,31 @@ def walk(node):
             yield from walk(child)
 
 
-if __name__ == '__main__':
-    tree = build_fs_tree()
-
-    display(tree)
+def sum_small_dirs(tree, max_size=100000):
+    small_sizes = (node.total_size() for node in walk(tree) if node.is_dir() and node.total_size() <= max_size)
+    return sum(small_sizes)
 
-    small_sizes = (node.total_size() for node in walk(tree) if node.is_dir() and node.total_size() <= 100000)
-    print(sum(small_sizes))
 
-    total_space = 70000000
-    target_space = 30000000
+def find_dir_to_delete(tree, total_space=70000000, target_space=30000000):
     used_space = tree.total_size()
     free_space = total_space - used_space
     delete_space = target_space - free_space
     candidates = list(node for node in walk(tree) 
                       if node.is_dir() and node.total_size() >= delete_space)
-    min_candidate = min(candidates, key=lambda node: node.total_size())
+    return min(candidates, key=lambda node: node.total_size())
+
+
+def solve(text):
+    tree = build_fs_tree(text.splitlines())
+    return sum_small_dirs(tree), find_dir_to_delete(tree).total_size()
+
+
+if __name__ == '__main__':
+    tree = build_fs_tree()
+
+    display(tree)
+
+    print(sum_small_dirs(tree))
+
+    min_candidate = find_dir_to_delete(tree)
     print(min_candidate.total_size())
-    
@@ -3,10 +3,13 @@ from dataclasses import dataclass
 import fileinput
 
 
-def read_board():
+def read_board(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     board = []
 
-    for line in fileinput.input():
+    for line in lines:
         row = [int(c) for c in line.strip()]
         board.append(row)
 
@@ -98,6 +101,12 @@ def display_board_int(board):
     return '\n'.join(''.join(str(int(cell)) for cell in row) for row in board)
 
 
+def solve(text):
+    board = read_board(text.splitlines())
+    visible = find_visible(board)
+    return sum(sum(row) for row in visible), find_best_score(board)
+
+
 if __name__ == '__main__':
     board = read_board()
     print(display_board_int(board))
@@ -8,13 +8,16 @@ class Position:
     y: int
 
 
-def simulate_moves(segment_num):
+def simulate_moves(segment_num, lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     segments = [Position(0, 0) for i in range(segment_num)]
     head, tail = segments[0], segments[-1]
 
     unique_positions = set()
 
-    for line in fileinput.input():
+    for line in lines:
         direction, steps = line.split()
 
         for step in range(int(steps)):
@@ -46,6 +49,11 @@ def simulate_moves(segment_num):
     return unique_positions
 
 
+def solve(text):
+    lines = text.splitlines()
+    return len(simulate_moves(2, lines)), len(simulate_moves(10, lines))
+
+
 if __name__ == '__main__':
     #unique_positions = simulate_moves(2)
     #print(len(unique_positions))
@@ -2,13 +2,16 @@ from dataclasses import dataclass
 import fileinput
 
 
-def simulate_instructions_count():
+def simulate_instructions_count(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     result = 0
 
     time = 1
     register = 1
 
-    for line in fileinput.input():
+    for line in lines:
         instruction, *args = line.split()
 
         if instruction == 'noop':
@@ -30,13 +33,16 @@ def simulate_instructions_count():
     return result
 
 
-def simulate_instructions_draw():
+def simulate_instructions_draw(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     result = ['.'] * 240
 
     time = 0
     register = 1
 
-    for line in fileinput.input():
+    for line in lines:
         instruction, *args = line.split()
 
         if instruction == 'noop':
@@ -59,11 +65,22 @@ def simulate_instructions_draw():
     return result
 
 
+def show_display(display):
+    return '\n'.join(''.join(display[i:i+40]) for i in range(0, 240, 40))
+
+
+def solve(text):
+    lines = text.splitlines()
+    return (
+        simulate_instructions_count(lines),
+        show_display(simulate_instructions_draw(lines)),
+    )
+
+
 if __name__ == '__main__':
     #result = simulate_instructions_count()
     #print(result)
 
     display = simulate_instructions_draw()
-    for i in range(0, 240, 40):
-        print(''.join(display[i:i+40]))
+    print(show_display(display))
 
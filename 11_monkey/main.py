@@ -1,13 +1,21 @@
+import concurrent.futures
 import re
 from dataclasses import dataclass
 import fileinput
-from typing import Dict, List, Protocol
+import functools
+import os
+import numpy as np
+import operator
+from typing import Callable, Dict, List, Protocol
 
 
 class Expression(Protocol):
     def evaluate(self, environment: Dict[str, int]) -> int:
         ...
 
+    def compile(self, var: str = 'old') -> Callable[[int], int]:
+        ...
+
     @staticmethod
     def parse(line: str):
         def const_or_var(token):
@@ -30,6 +38,11 @@ class Var(Expression):
     def evaluate(self, environment: Dict[str, int]) -> int:
         return environment[self.name]
 
+    def compile(self, var: str = 'old') -> Callable[[int], int]:
+        if self.name != var:
+            raise ValueError(f"Unknown variable '{self.name}'")
+        return lambda old: old
+
 @dataclass
 class Const(Expression):
     value: int
@@ -37,6 +50,10 @@ class Const(Expression):
     def evaluate(self, environment: Dict[str, int]) -> int:
         return self.value
 
+    def compile(self, var: str = 'old') -> Callable[[int], int]:
+        value = self.value
+        return lambda old: value
+
 @dataclass
 class BinOp(Expression):
     a: Expression
@@ -51,7 +68,30 @@ class BinOp(Expression):
         elif self.op == '*':
             return a_val * b_val
         else:
-            raise ValueError(f"Unrecognized operation '{op}'")
+            raise ValueError(f"Unrecognized operation '{self.op}'")
+
+    def compile(self, var: str = 'old') -> Callable[[int], int]:
+        """A function of the variable doing what `evaluate` does, without the tree walk."""
+        if self.op == '+':
+            function = operator.add
+        elif self.op == '*':
+            function = operator.mul
+        else:
+            raise ValueError(f"Unrecognized operation '{self.op}'")
+
+        a, b = self.a, self.b
+        if isinstance(a, Var) and isinstance(b, Var) and a.name == b.name == var:
+            if self.op == '*':
+                return lambda old: old * old
+            return lambda old: old + old
+        # Both operations are commutative, so the constant can go first.
+        if isinstance(a, Var) and a.name == var and isinstance(b, Const):
+            return functools.partial(function, b.value)
+        if isinstance(a, Const) and isinstance(b, Var) and b.name == var:
+            return functools.partial(function, a.value)
+
+        a_function, b_function = a.compile(var), b.compile(var)
+        return lambda old: function(a_function(old), b_function(old))
 
 
 @dataclass
@@ -62,8 +102,21 @@ class Monkey:
     test_target_true: int
     test_target_false: int
 
+    @functools.cached_property
+    def operation(self) -> Callable[[int], int]:
+        return self.operation_expr.compile()
+
+    def __getstate__(self):
+        # The compiled operation may be a lambda, which does not pickle.
+        state = self.__dict__.copy()
+        state.pop('operation', None)
+        return state
+
+
+def parse_input(lines=None):
+    if lines is None:
+        lines = fileinput.input()
 
-def parse_input():
     monkeys = []
 
     NEW_MONKEY_RE = re.compile(r"Monkey (\d+):")
@@ -75,7 +128,7 @@ def parse_input():
 
     monkey = None
 
-    for line in fileinput.input():
+    for line in lines:
         line = line.strip()
         if match := NEW_MONKEY_RE.match(line):
             if monkey is not None:
@@ -106,22 +159,24 @@ def parse_input():
     return monkeys
 
 
-def simulate_throws(monkeys, rounds, worry_mod):
+def simulate_throws(monkeys, rounds, worry_mod, relief=1, verbose=False):
     counts = [0] * len(monkeys)
 
     for round in range(rounds):
         for i, monkey in enumerate(monkeys):
             for item in monkey.items:
                 counts[i] += 1
-                new_item = monkey.operation_expr.evaluate(dict(old=item))
-                new_item %= worry_mod
+                new_item = monkey.operation(item)
+                new_item //= relief
+                if worry_mod is not None:
+                    new_item %= worry_mod
                 if new_item % monkey.test_divisor == 0:
                     monkeys[monkey.test_target_true].items.append(new_item)
                 else:
                     monkeys[monkey.test_target_false].items.append(new_item)
             monkey.items.clear()
 
-        if round % (rounds // 20) == 0:
+        if verbose and round % max(1, rounds // 20) == 0:
             print('Round', round)
             for monkey in monkeys:
                 print(monkey.items)
@@ -129,18 +184,175 @@ def simulate_throws(monkeys, rounds, worry_mod):
     return counts
 
 
+def find_quadratic(function):
+    """(a, b, c) with function(old) == a * old ** 2 + b * old + c."""
+    c = function(0)
+    a = (function(2) - 2 * function(1) + c) // 2
+    b = function(1) - a - c
+    if function(3) != 9 * a + 3 * b + c or a not in (0, 1):
+        raise ValueError('Vectorized simulation needs a + or * operation')
+    return a, b, c
+
+
+# A vectorized step costs about the same for 36 items as for 1000, and there
+# are at least `rounds` of them. Following items one by one is faster below this.
+VECTORIZED_MIN_ITEMS = 200
+
+
+def simulate_throws_vectorized(monkeys, rounds, worry_mod, relief=1):
+    """Same counts as `simulate_throws`, moving every item one throw per NumPy step."""
+    if worry_mod is None:
+        raise ValueError('Vectorized simulation needs a worry_mod')
+    # Items are residues, one row per modulus. When (worry_mod - 1) ** 2 does
+    # not fit in int64, each test divisor gets its own row instead.
+    if (worry_mod - 1) ** 2 + 20 * worry_mod <= np.iinfo(np.int64).max:
+        moduli = [worry_mod]
+        test_rows = [0] * len(monkeys)
+    elif relief == 1:
+        moduli = [monkey.test_divisor for monkey in monkeys]
+        test_rows = list(range(len(monkeys)))
+    else:
+        raise ValueError(f'Worry mod {worry_mod} is too large for int64 items with relief')
+    moduli = np.array(moduli, dtype=np.int64)[:, None]
+
+    square, factor, term = (np.array(column, dtype=np.int64)
+                            for column in zip(*(find_quadratic(m.operation) for m in monkeys)))
+    divisors = np.array([monkey.test_divisor for monkey in monkeys], dtype=np.int64)
+    targets_true = np.array([monkey.test_target_true for monkey in monkeys], dtype=np.int64)
+    targets_false = np.array([monkey.test_target_false for monkey in monkeys], dtype=np.int64)
+    test_rows = np.array(test_rows, dtype=np.int64)
+
+    current = np.array([i for i, monkey in enumerate(monkeys) for item in monkey.items],
+                       dtype=np.int64)
+    items = np.array([item for monkey in monkeys for item in monkey.items],
+                     dtype=np.int64)[None, :] % moduli
+    rounds_left = np.full(len(current), rounds, dtype=np.int64)
+    counts = np.zeros(len(monkeys), dtype=np.int64)
+
+    # Items never affect each other, so each one can run through its own
+    # rounds. A throw to a monkey later in the order stays in the same round.
+    while len(current):
+        counts += np.bincount(current, minlength=len(monkeys))
+
+        new_items = (square[current] * (items * items % moduli)
+                     + factor[current] * items + term[current])
+        if relief != 1:
+            new_items //= relief
+        items = new_items % moduli
+
+        passed = items[test_rows[current], np.arange(len(current))] % divisors[current] == 0
+        targets = np.where(passed, targets_true[current], targets_false[current])
+        rounds_left -= targets <= current
+        current = targets
+
+        if not rounds_left.all():
+            running = rounds_left > 0
+            current, items, rounds_left = current[running], items[:, running], rounds_left[running]
+
+    return counts.tolist()
+
+
+def simulate_item(monkeys, monkey_i, worry, rounds, worry_mod, relief=1):
+    """Inspection counts per monkey for a single item starting at `monkey_i`."""
+    # Once a round starts from a (monkey, worry) seen before, the rest of the run
+    # repeats the rounds in between, so it is counted from the history.
+    counts = [0] * len(monkeys)
+    seen_rounds = {}
+    history = []
+
+    round = 0
+    while round < rounds:
+        state = (monkey_i, worry)
+        if state in seen_rounds:
+            first_round = seen_rounds[state]
+            cycle_rounds = round - first_round
+            cycles, rest = divmod(rounds - round, cycle_rounds)
+            start, rest_end = history[first_round], history[first_round + rest]
+            return [
+                count + cycles * (count - start_count) + rest_count - start_count
+                for count, start_count, rest_count in zip(counts, start, rest_end)
+            ]
+        seen_rounds[state] = round
+        history.append(tuple(counts))
+
+        # Throws to a monkey later in the order happen in the same round.
+        while True:
+            monkey = monkeys[monkey_i]
+            counts[monkey_i] += 1
+            worry = monkey.operation(worry) // relief
+            if worry_mod is not None:
+                worry %= worry_mod
+            if worry % monkey.test_divisor == 0:
+                target = monkey.test_target_true
+            else:
+                target = monkey.test_target_false
+            passed_round = target <= monkey_i
+            monkey_i = target
+            if passed_round:
+                break
+        round += 1
+
+    return counts
+
+
+def simulate_throws_by_item(monkeys, rounds, worry_mod, relief=1, workers=None):
+    """Same counts as `simulate_throws`, adding up `simulate_item` for every item."""
+    items = [(i, item) for i, monkey in enumerate(monkeys) for item in monkey.items]
+    simulate = functools.partial(
+        simulate_item, monkeys, rounds=rounds, worry_mod=worry_mod, relief=relief
+    )
+    if workers == 1 or len(items) <= 1:
+        item_counts = [simulate(i, item) for i, item in items]
+    else:
+        workers = workers or os.cpu_count()
+        chunksize = max(1, len(items) // (workers * 4))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            item_counts = list(executor.map(simulate, *zip(*items), chunksize=chunksize))
+
+    counts = [0] * len(monkeys)
+    for item_count in item_counts:
+        for i, count in enumerate(item_count):
+            counts[i] += count
+    return counts
+
+
+def find_worry_mod(monkeys):
+    worry_mod = 1
+    for monkey in monkeys:
+        worry_mod *= monkey.test_divisor
+    return worry_mod
+
+
+def find_monkey_business(counts):
+    counts = sorted(counts, reverse=True)
+    return counts[0] * counts[1]
+
+
+def solve(text):
+    monkeys = parse_input(text.splitlines())
+    counts = simulate_throws(monkeys, rounds=20, worry_mod=None, relief=3)
+    part1 = find_monkey_business(counts)
+
+    monkeys = parse_input(text.splitlines())
+    worry_mod = find_worry_mod(monkeys)
+    if sum(len(monkey.items) for monkey in monkeys) >= VECTORIZED_MIN_ITEMS:
+        counts = simulate_throws_vectorized(monkeys, rounds=10000, worry_mod=worry_mod)
+    else:
+        counts = simulate_throws_by_item(monkeys, rounds=10000, worry_mod=worry_mod, workers=1)
+    part2 = find_monkey_business(counts)
+
+    return part1, part2
+
+
 if __name__ == '__main__':
     monkeys = parse_input()
     for monkey in monkeys:
         print(monkey)
 
-    worry_mod = 1
-    for monkey in monkeys:
-        worry_mod *= monkey.test_divisor
+    worry_mod = find_worry_mod(monkeys)
 
-    counts = simulate_throws(monkeys, rounds=10000, worry_mod=worry_mod)
+    counts = simulate_throws_by_item(monkeys, rounds=10000, worry_mod=worry_mod)
     print(counts)
 
-    counts.sort(reverse=True)
-    print(counts[0] * counts[1])
+    print(find_monkey_business(counts))
 
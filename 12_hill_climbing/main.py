@@ -2,13 +2,16 @@ import fileinput
 import collections
 
 
-def read_board():
+def read_board(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     start = None
     end = None
     board = []
 
     ord_a = ord('a')
-    for y, line in enumerate(fileinput.input()):
+    for y, line in enumerate(lines):
         line = line.strip()
         if not line:
             break
@@ -102,6 +105,11 @@ def find_shortest(board, start):
     return -1
 
 
+def solve(text):
+    board, start, end = read_board(text.splitlines())
+    return find_path(board, start, end), find_shortest(board, end)
+
+
 if __name__ == '__main__':
     board, start, end = read_board()
     print(board, start, end)
@@ -30,13 +30,16 @@ def compare_packets(left, right):
         return compare_lists(left, right)
 
 
-def load_packet_pairs():
+def load_packet_pairs(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     left = None
     right = None
     pair_i = 1
     equal_sum = 0
 
-    for i, line in enumerate(fileinput.input()):
+    for i, line in enumerate(lines):
         line = line.strip()
 
         if i % 3 == 0:
@@ -51,10 +54,13 @@ def load_packet_pairs():
     return equal_sum
 
 
-def load_packets():
+def load_packets(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     packets = []
 
-    for i, line in enumerate(fileinput.input()):
+    for i, line in enumerate(lines):
         line = line.strip()
 
         if line:
@@ -64,12 +70,7 @@ def load_packets():
     return packets
 
 
-if __name__ == '__main__':
-    # equal_sum = load_packet_pairs()
-    # print(equal_sum)
-
-    packets = load_packets()
-
+def find_decoder_key(packets):
     divisors = [[[6]], [[2]]]
     less_than_divisor_counts = [1, 0]
 
@@ -82,5 +83,18 @@ if __name__ == '__main__':
     result = 1
     for count in less_than_divisor_counts:
         result *= count + 1
-    print(result)
+    return result
+
+
+def solve(text):
+    lines = text.splitlines()
+    return load_packet_pairs(lines), find_decoder_key(load_packets(lines))
+
+
+if __name__ == '__main__':
+    # equal_sum = load_packet_pairs()
+    # print(equal_sum)
+
+    packets = load_packets()
+    print(find_decoder_key(packets))
 
@@ -10,10 +10,13 @@ class Point:
     y: int
 
 
-def read_structures():
+def read_structures(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     structures = []
 
-    for line in fileinput.input():
+    for line in lines:
         line = line.strip()
         parts = [part.split(",") for part in line.split(" -> ")]
         structure = [Point(x=int(part[0]), y=int(part[1])) for part in parts]
@@ -163,6 +166,118 @@ def simulate_falling(board):
     return count
 
 
+@dataclass
+class Cave:
+    """The board as one bytearray with `bottoms`, the `find_bottom` value of every column."""
+    min_x: int
+    width: int
+    height: int
+    bottoms: List[int]
+    cells: bytearray
+
+    def index(self, x, y):
+        return y * self.width + x - self.min_x
+
+
+def make_cave(bottom, source_x=500):
+    """Sizes the cave so that sand never leaves it except into the abyss."""
+    # With a floor, sand spreads at most one column per row from the source.
+    ground = bottom.default_factory()
+    if ground >= 0:
+        min_x = min(min(bottom.keys()), source_x - ground) - 1
+        max_x = max(max(bottom.keys()), source_x + ground) + 1
+    else:
+        min_x = min(min(bottom.keys()), source_x) - 1
+        max_x = max(max(bottom.keys()), source_x) + 1
+    width = max_x - min_x + 1
+    bottoms = [bottom.get(x, ground) for x in range(min_x, max_x + 1)]
+    height = max(bottoms) + 1
+    cells = bytearray(width * height)
+    for i, column_bottom in enumerate(bottoms):
+        if column_bottom >= 0:
+            cells[column_bottom * width + i] = FieldEnum.BLOCK
+    return Cave(min_x, width, height, bottoms, cells)
+
+
+def fill_cave(cave, structures):
+    for structure in structures:
+        for prev_point, point in zip(structure, structure[1:]):
+            for x in range(min(prev_point.x, point.x), max(prev_point.x, point.x) + 1):
+                for y in range(min(prev_point.y, point.y), max(prev_point.y, point.y) + 1):
+                    cave.cells[cave.index(x, y)] = FieldEnum.BLOCK
+
+
+def drop_sand(cave, source_x=500):
+    """Counts the grains that come to rest, like `simulate_falling`."""
+    # A grain at rest only blocks its own cell, so the next one falls the same
+    # way as the last one up to the cell before it, and starts there.
+    cells, width = cave.cells, cave.width
+    bottoms, min_x = cave.bottoms, cave.min_x
+    count = 0
+
+    path = [cave.index(source_x, 0)]
+    while path:
+        i = path[-1]
+        for next_i in (i + width, i + width - 1, i + width + 1):
+            if not cells[next_i]:
+                break
+        else:
+            cells[i] = FieldEnum.FILL
+            count += 1
+            path.pop()
+            continue
+
+        y, x = divmod(next_i, width)
+        if y >= bottoms[x]:
+            return count
+        path.append(next_i)
+
+    return count
+
+
+def find_rock_rows(structures, min_x, max_x, max_y):
+    """Rocks as one bitmask per row, bit i standing for x = min_x + i."""
+    rows = defaultdict(int)
+    for structure in structures:
+        for prev_point, point in zip(structure, structure[1:]):
+            from_x = max(min(prev_point.x, point.x), min_x)
+            to_x = min(max(prev_point.x, point.x), max_x)
+            if from_x > to_x:
+                continue
+            mask = ((1 << (to_x - from_x + 1)) - 1) << (from_x - min_x)
+            for y in range(min(prev_point.y, point.y), min(max(prev_point.y, point.y), max_y) + 1):
+                rows[y] |= mask
+    return rows
+
+
+def count_sand_with_floor(structures, ground, source_x=500):
+    """Counts the grains that come to rest above a floor at `ground`, without dropping any."""
+    # With a floor, sand ends up in exactly the cells it can reach from the
+    # source by steps down, down-left or down-right.
+    min_x, max_x = source_x - ground, source_x + ground
+    rock_rows = find_rock_rows(structures, min_x, max_x, ground - 1)
+
+    reachable = 1 << (source_x - min_x)
+    count = reachable.bit_count()
+    for y in range(1, ground):
+        reachable = (reachable | (reachable << 1) | (reachable >> 1)) & ~rock_rows[y]
+        count += reachable.bit_count()
+    return count
+
+
+def solve(text):
+    structures = read_structures(text.splitlines())
+    max_y = find_max_y(structures)
+
+    bottom = find_bottom(structures, ground=-1)
+    cave = make_cave(bottom)
+    fill_cave(cave, structures)
+    part1 = drop_sand(cave)
+
+    part2 = count_sand_with_floor(structures, ground=max_y + 2)
+    return part1, part2
+
+
 if __name__ == '__main__':
     structures = read_structures()
     print(structures)
@@ -1,5 +1,6 @@
 from collections import defaultdict, namedtuple
 from dataclasses import dataclass
+import numpy as np
 import re
 from typing import Dict, List
 import fileinput
@@ -22,12 +23,15 @@ class Beacon:
     y: int
 
 
-def read_map():
+def read_map(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     sensors = []
     beacons = []
 
     sensor_re = re.compile(r"Sensor at x=(.+), y=(.+): closest beacon is at x=(.+), y=(.+)")
-    for line in fileinput.input():
+    for line in lines:
         match = sensor_re.match(line)
         x, y, b_x, b_y = map(int, match.groups())
         detect_range = abs(x - b_x) + abs(y - b_y)
@@ -40,20 +44,77 @@ def read_map():
 
 
 def find_covered_at_y(sensors, target_y):
-    covered = set()
-
+    """Merged, sorted (start, end) intervals of x covered at `target_y`, ends inclusive."""
+    spans = []
     for sensor in sensors:
         target_dist = abs(sensor.y - target_y)
         if target_dist > sensor.detect_range:
             continue
         target_span = sensor.detect_range - target_dist
+        spans.append((sensor.x - target_span, sensor.x + target_span))
+    spans.sort()
 
-        new_covered = range(sensor.x - target_span, sensor.x + target_span + 1)
-        covered.update(new_covered)
+    covered = []
+    for start, end in spans:
+        if covered and start <= covered[-1][1] + 1:
+            if end > covered[-1][1]:
+                covered[-1] = (covered[-1][0], end)
+        else:
+            covered.append((start, end))
 
     return covered
 
 
+def count_covered(covered, excluded_xs=()):
+    count = sum(end - start + 1 for start, end in covered)
+    for x in excluded_xs:
+        if any(start <= x <= end for start, end in covered):
+            count -= 1
+    return count
+
+
+def count_covered_at_ys(sensors, ys, beacons=None, chunk_size=4096):
+    """Number of covered x, minus `beacons`, for every y in `ys`, a chunk of rows at a time."""
+    ys = np.asarray(ys, dtype=np.int64)
+    sensor_xs = np.array([sensor.x for sensor in sensors], dtype=np.int64)
+    sensor_ys = np.array([sensor.y for sensor in sensors], dtype=np.int64)
+    ranges = np.array([sensor.detect_range for sensor in sensors], dtype=np.int64)
+    counts = np.zeros(len(ys), dtype=np.int64)
+    if not sensors:
+        return counts
+
+    for chunk_start in range(0, len(ys), chunk_size):
+        rows = ys[chunk_start:chunk_start + chunk_size]
+        spans = ranges - np.abs(sensor_ys - rows[:, None])
+        in_range = spans >= 0
+        starts = np.where(in_range, sensor_xs - spans, np.iinfo(np.int64).max)
+        ends = np.where(in_range, sensor_xs + spans, np.iinfo(np.int64).min)
+
+        # Sorted by start, each span only adds the part past the furthest end before it.
+        order = np.argsort(starts, axis=1)
+        starts = np.take_along_axis(starts, order, axis=1)
+        ends = np.take_along_axis(ends, order, axis=1)
+        reached = np.maximum.accumulate(ends, axis=1)
+        reached = np.concatenate(
+            [np.full((len(rows), 1), np.iinfo(np.int64).min), reached[:, :-1]], axis=1
+        )
+
+        fresh_starts = np.maximum(starts, reached + 1)
+        added = np.where(ends >= fresh_starts, ends - fresh_starts + 1, 0)
+        counts[chunk_start:chunk_start + chunk_size] = added.sum(axis=1)
+
+    if beacons:
+        # Every beacon is covered by the sensor that saw it.
+        beacon_ys = np.array([y for x, y in {(beacon.x, beacon.y) for beacon in beacons}],
+                             dtype=np.int64)
+        beacon_ys, beacon_counts = np.unique(beacon_ys, return_counts=True)
+        positions = np.searchsorted(beacon_ys, ys)
+        positions = np.minimum(positions, len(beacon_ys) - 1)
+        counts -= np.where(beacon_ys[positions] == ys, beacon_counts[positions], 0)
+
+    return counts
+
+
 def find_beacons_at_y(beacons, target_y):
     xs = set()
     for beacon in beacons:
@@ -76,6 +137,65 @@ def find_unique_uncovered(sensors, min_x, max_x, min_y, max_y):
                 return Beacon(x=x, y=y)
 
 
+def find_edge_crossings(a, b):
+    """Points just outside both sensors' ranges where their diamond edges cross."""
+    # Rising edges are kept as y - x and falling ones as y + x.
+    reach_a = a.detect_range + 1
+    reach_b = b.detect_range + 1
+    if abs(a.x - b.x) + abs(a.y - b.y) > reach_a + reach_b:
+        return
+
+    for first, reach_first, second, reach_second in ((a, reach_a, b, reach_b),
+                                                     (b, reach_b, a, reach_a)):
+        for rising in (first.y - first.x - reach_first, first.y - first.x + reach_first):
+            for falling in (second.y + second.x - reach_second,
+                            second.y + second.x + reach_second):
+                if (falling - rising) % 2:
+                    continue
+                x, y = (falling - rising) // 2, (falling + rising) // 2
+                if abs(a.x - x) + abs(a.y - y) == reach_a \
+                   and abs(b.x - x) + abs(b.y - y) == reach_b:
+                    yield x, y
+
+
+def find_uncovered_by_edges(sensors, min_x, max_x, min_y, max_y):
+    """Finds an uncovered point without scanning rows."""
+    # A lone uncovered point lies just outside two diamonds where their edges
+    # cross, or just outside one of them on the border of the area.
+    candidates = {(x, y) for x in (min_x, max_x) for y in (min_y, max_y)}
+    for i, a in enumerate(sensors):
+        for b in sensors[i:]:
+            candidates.update(find_edge_crossings(a, b))
+
+        reach = a.detect_range + 1
+        for x in (min_x, max_x):
+            if abs(a.x - x) <= reach:
+                candidates.update((x, a.y + dy * (reach - abs(a.x - x))) for dy in (-1, 1))
+        for y in (min_y, max_y):
+            if abs(a.y - y) <= reach:
+                candidates.update((a.x + dx * (reach - abs(a.y - y)), y) for dx in (-1, 1))
+
+    for x, y in sorted(candidates, key=lambda c: (c[1], c[0])):
+        if not (min_x <= x <= max_x and min_y <= y <= max_y):
+            continue
+        if not any(sensor.covers(x, y) for sensor in sensors):
+            return Beacon(x=x, y=y)
+
+
+def solve(text, target_y=2000000, max_valid=4000000):
+    sensors, beacons = read_map(text.splitlines())
+    sensors.sort(key=lambda s: s.detect_range, reverse=True)
+
+    covered = find_covered_at_y(sensors, target_y=target_y)
+    beacon_xs = find_beacons_at_y(beacons, target_y=target_y)
+    part1 = count_covered(covered, beacon_xs)
+
+    uncovered = find_uncovered_by_edges(sensors, 0, max_valid, 0, max_valid)
+    part2 = uncovered.x * 4000000 + uncovered.y
+
+    return part1, part2
+
+
 if __name__ == '__main__':
     sensors, beacons = read_map()
     sensors.sort(key=lambda s: s.detect_range, reverse=True)
@@ -84,12 +204,11 @@ if __name__ == '__main__':
     target_y = 2000000
     covered = find_covered_at_y(sensors, target_y=target_y)
     beacon_xs = find_beacons_at_y(beacons, target_y=target_y)
-    new_covered = covered - beacon_xs
-    print(len(new_covered))
+    print(count_covered(covered, beacon_xs))
 
     #max_valid = 20
     max_valid = 4000000
-    uncovered = find_unique_uncovered(sensors, 0, max_valid, 0, max_valid)
+    uncovered = find_uncovered_by_edges(sensors, 0, max_valid, 0, max_valid)
     print(uncovered)
     print(uncovered.x * 4000000 + uncovered.y)
 
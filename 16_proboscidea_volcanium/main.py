@@ -1,7 +1,9 @@
 import collections
 from dataclasses import dataclass
+import functools
+import numpy as np
 import re
-from typing import List
+from typing import Dict, List
 import fileinput
 
 
@@ -12,11 +14,14 @@ class Node:
     neighbors: List[str]
 
 
-def read_map():
+def read_map(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     nodes = {}
 
     node_re = re.compile(r"Valve (.+) has flow rate=(.+); tunnels? leads? to valves? (.+)")
-    for line in fileinput.input():
+    for line in lines:
         match = node_re.match(line)
         name, flow, neighbors = match.groups()
         flow = int(flow)
@@ -53,72 +58,136 @@ def make_connection_matrix(nodes):
     return matrix
 
 
-def find_best_route(nodes, matrix, start, time_limit, actor_num):
-    opened = {name: node.flow == 0 for name, node in nodes.items()}
-    start_positions = [(0, start)] * actor_num
-    bestest_flow = [0]
-
-    def visit(positions, time_left, flow):
-        node_name = positions[0][1]
-        other_positions = positions[1:]
-        other_min_distance = None
-        if other_positions:
-            other_min_distance = min(pos[0] for pos in other_positions)
-
-        flow_gain = nodes[node_name].flow * time_left
-        new_flow = flow + flow_gain
-        best_flow = new_flow
-
-        opened_any = False
-        for neighbor_name, distance in matrix[node_name].items():
-            if not opened[neighbor_name] and time_left > distance:
-                opened_any = True
-                opened[neighbor_name] = True
-
-                if not other_positions:
-                    min_distance = distance
-                    new_positions = [(0, neighbor_name)]
-                else:
-                    min_distance = min(distance, other_min_distance)
-
-                    new_positions = [(distance - min_distance, name)
-                                     for distance, name in other_positions]
-                    new_positions.append((distance - min_distance, neighbor_name))
-                    new_positions.sort()
-
-                child_flow = visit(
-                    new_positions, time_left - min_distance, new_flow
-                )
-                if child_flow > best_flow:
-                    best_flow = child_flow
-
-                opened[neighbor_name] = False
-
-        if not opened_any and other_positions:
-            new_positions = [(distance - other_min_distance, name)
-                             for distance, name in other_positions]
-            child_flow = visit(
-                new_positions, time_left - other_min_distance, new_flow
-            )
-            best_flow = max(best_flow, child_flow)
-            bestest_flow[0] = max(bestest_flow[0], best_flow)
-            print(bestest_flow[0])
+UNREACHABLE = 1 << 30
+
+
+@dataclass
+class DistanceMatrix:
+    index: Dict[str, int]
+    distances: np.ndarray
+
+    def distance(self, a, b):
+        return self.distances[self.index[a], self.index[b]]
+
+    def prune(self, names):
+        names = list(dict.fromkeys(names))
+        rows = [self.index[name] for name in names]
+        return DistanceMatrix(
+            index={name: i for i, name in enumerate(names)},
+            distances=self.distances[np.ix_(rows, rows)],
+        )
+
 
+def make_distance_matrix(nodes):
+    index = {name: i for i, name in enumerate(nodes.keys())}
+    size = len(index)
+
+    distances = np.full((size, size), UNREACHABLE, dtype=np.int64)
+    np.fill_diagonal(distances, 0)
+    for name, node in nodes.items():
+        for neighbor_name in node.neighbors:
+            distances[index[name], index[neighbor_name]] = 1
+
+    for k in range(size):
+        np.minimum(distances, distances[:, k, np.newaxis] + distances[np.newaxis, k, :],
+                   out=distances)
+
+    return DistanceMatrix(index, distances)
+
+
+def prune_to_flowing(nodes, matrix, start):
+    valves = [name for name, node in nodes.items() if node.flow > 0]
+    return matrix.prune(valves + [start])
+
+
+def find_best_flows(nodes, matrix, start, time_limit):
+    pruned = prune_to_flowing(nodes, matrix, start)
+    flows = [nodes[name].flow for name in pruned.index]
+    valve_num = sum(flow > 0 for flow in flows)
+    # a move takes as many minutes as the path is long, plus one to open the valve
+    distances = (pruned.distances + 1).tolist()
+    start_distances = distances[pruned.index[start]]
+
+    best_flows = {0: 0}
+    best_states = {}
+    stack = []
+    for i in range(valve_num):
+        time_left = time_limit - start_distances[i]
+        if time_left > 0:
+            stack.append((i, 1 << i, time_left, flows[i] * time_left))
+
+    while stack:
+        node, opened, time_left, flow = stack.pop()
+        state = (node, opened, time_left)
+        if best_states.get(state, -1) >= flow:
+            continue
+        best_states[state] = flow
+        if best_flows.get(opened, 0) < flow:
+            best_flows[opened] = flow
+
+        for neighbor in range(valve_num):
+            distance = distances[node][neighbor]
+            neighbor_bit = 1 << neighbor
+            if opened & neighbor_bit or time_left <= distance:
+                continue
+            neighbor_time_left = time_left - distance
+            stack.append((
+                neighbor, opened | neighbor_bit, neighbor_time_left,
+                flow + flows[neighbor] * neighbor_time_left
+            ))
+
+    return valve_num, best_flows
+
+
+def find_best_route(nodes, matrix, start, time_limit, actor_num):
+    valve_num, best_flows = find_best_flows(nodes, matrix, start, time_limit)
+    all_opened = (1 << valve_num) - 1
+
+    # the best flow a single actor gets when limited to a subset of valves
+    subset_flows = [0] * (all_opened + 1)
+    for opened, flow in best_flows.items():
+        subset_flows[opened] = flow
+    for bit in range(valve_num):
+        valve_bit = 1 << bit
+        for opened in range(all_opened + 1):
+            if opened & valve_bit and subset_flows[opened ^ valve_bit] > subset_flows[opened]:
+                subset_flows[opened] = subset_flows[opened ^ valve_bit]
+
+    routes = sorted(best_flows.items(), key=lambda route: route[1], reverse=True)
+
+    @functools.cache
+    def visit(allowed, actor_num):
+        if actor_num == 1:
+            return subset_flows[allowed]
+
+        best_flow = 0
+        for opened, flow in routes:
+            if flow + subset_flows[allowed] * (actor_num - 1) <= best_flow:
+                break
+            if flow + subset_flows[allowed ^ opened] * (actor_num - 1) <= best_flow:
+                continue
+            if opened & allowed == opened:
+                best_flow = max(best_flow, flow + visit(allowed ^ opened, actor_num - 1))
         return best_flow
 
-    best_flow = visit(
-        positions=start_positions, time_left=time_limit, flow=0
-    )
+    return visit(all_opened, actor_num)
 
-    return best_flow
+
+def solve(text):
+    nodes = read_map(text.splitlines())
+    matrix = make_distance_matrix(nodes)
+    return (
+        find_best_route(nodes, matrix, start='AA', time_limit=30, actor_num=1),
+        find_best_route(nodes, matrix, start='AA', time_limit=26, actor_num=2),
+    )
 
 
 if __name__ == '__main__':
     nodes = read_map()
     print(nodes)
 
-    matrix = make_connection_matrix(nodes)
-    print(len(matrix))
+    matrix = make_distance_matrix(nodes)
+    print(len(matrix.index))
 
     #result = find_best_route(nodes, matrix, start='AA', time_limit=30, actor_num=1)
     #print(result)
@@ -24,8 +24,10 @@ class Move:
             return '>'
 
 
-def read_moves():
-    line = input()
+def read_moves(line=None):
+    if line is None:
+        line = input()
+
     moves = [Move.parse(c) for c in line]
     return moves
 
@@ -124,15 +126,15 @@ class Board:
             self.fields.append([Field.EMPTY] * self.width)
 
     def check_collides(self, block):
-        if block.x < 0 or block.x + block.width > board.width or block.y < 0:
+        if block.x < 0 or block.x + block.width > self.width or block.y < 0:
             return True
-        if block.y > board.height:
+        if block.y > self.height:
             return False
 
-        for i, y in enumerate(range(block.y, min(block.y + block.height, board.height))):
+        for i, y in enumerate(range(block.y, min(block.y + block.height, self.height))):
             for j, x in enumerate(range(block.x, block.x + block.width)):
                 if block.shape.fields[i][j] == Field.BLOCK \
-                   and board.fields[y][x] == Field.BLOCK:
+                   and self.fields[y][x] == Field.BLOCK:
                        return True
         
         return False
@@ -141,8 +143,8 @@ class Board:
         self.extend(block.y + block.height)
         for i in range(block.height):
             for j in range(block.width):
-                if board.fields[block.y + i][block.x + j] == Field.EMPTY:
-                    board.fields[block.y + i][block.x + j] = block.shape.fields[i][j]
+                if self.fields[block.y + i][block.x + j] == Field.EMPTY:
+                    self.fields[block.y + i][block.x + j] = block.shape.fields[i][j]
 
     def count_blocks(self):
         count = 0
@@ -163,6 +165,7 @@ class Board:
 def simulate(board, shapes, moves, block_num, signature_size):
     block_i = 0
     move_i = 0
+    skipped_height = 0
 
     signatures_seen = {}
 
@@ -210,15 +213,138 @@ def simulate(board, shapes, moves, block_num, signature_size):
                           f"{cycle_height} height. So skipped {skip_cycles} add "
                           f"{skip_height} height")
                     block_i += skip_blocks
+                    skipped_height += skip_height
                     print(f"Skipped to {block_i}")
                     signature_size = 0
             elif board.height > signature_size * 2:
                 print(f'Failed to find a cycle for the signature size {signature_size}')
-                return
+                return None
             signatures_seen[signature] = (block_i, board.height)
 
         block_i += 1
 
+    return board.height + skipped_height
+
+
+def make_shape_masks(shape, width):
+    """Row bitmasks of the shape, bottom up, for every x it fits at, None where it does not."""
+    positions = []
+    for x in range(width):
+        if x + shape.width > width:
+            positions.append(None)
+            continue
+        rows = tuple(
+            sum(1 << (x + j) for j, cell in enumerate(row) if cell == Field.BLOCK)
+            for row in shape.fields
+        )
+        positions.append(rows)
+    return positions
+
+
+def collides_packed(tower, rows, y):
+    if y < 0:
+        return True
+    height = len(tower)
+    for i, row in enumerate(rows):
+        if y + i >= height:
+            return False
+        if tower[y + i] & row:
+            return True
+    return False
+
+
+def find_sealed_floor(tower, width):
+    """Index of the highest row that no falling cell can get below, or 0."""
+    # Blocks only move sideways and down, so one sweep from the top finds
+    # every cell that can still be reached.
+    full = (1 << width) - 1
+    reach = full
+    for y in range(len(tower) - 1, -1, -1):
+        free = full & ~tower[y]
+        reach &= free
+        while True:
+            spread = reach | ((reach << 1) | (reach >> 1)) & free
+            if spread == reach:
+                break
+            reach = spread
+        if not reach:
+            return y
+    return 0
+
+
+def simulate_packed(shapes, moves, block_num, width=7, profile_depth=64,
+                    detect_cycles=True, trim_window=256):
+    """Drops blocks into a tower of one byte per row and returns its height."""
+    shape_masks = [make_shape_masks(shape, width) for shape in shapes]
+    tower = bytearray()
+    floor = 0
+    next_trim = trim_window
+    column_tops = [0] * width
+    signatures_seen = {} if detect_cycles else None
+    skipped_height = 0
+
+    block_i = 0
+    move_i = 0
+    while block_i < block_num:
+        positions = shape_masks[block_i % len(shapes)]
+        x, y = 2, len(tower) + 3
+
+        while True:
+            move = moves[move_i]
+            move_i = (move_i + 1) % len(moves)
+
+            shadow_x = x - 1 if move == Move.LEFT else x + 1
+            if 0 <= shadow_x < width and positions[shadow_x] is not None \
+               and not collides_packed(tower, positions[shadow_x], y):
+                x = shadow_x
+
+            if collides_packed(tower, positions[x], y - 1):
+                break
+            y -= 1
+
+        rows = positions[x]
+        while len(tower) < y + len(rows):
+            tower.append(0)
+        for i, row in enumerate(rows):
+            tower[y + i] |= row
+            for column in range(width):
+                if row >> column & 1 and column_tops[column] < floor + y + i + 1:
+                    column_tops[column] = floor + y + i + 1
+
+        # Nothing can fall below a sealed floor, so only its height is kept.
+        if trim_window and len(tower) >= next_trim:
+            sealed = find_sealed_floor(tower, width)
+            del tower[:sealed]
+            floor += sealed
+            next_trim = len(tower) + trim_window
+
+        if signatures_seen is not None:
+            height = floor + len(tower)
+            profile = tuple(min(height - top, profile_depth) for top in column_tops)
+            signature = (block_i % len(shapes), move_i, profile)
+            if signature in signatures_seen:
+                last_seen_i, last_seen_height = signatures_seen[signature]
+                cycle_i = block_i - last_seen_i
+                skip_cycles = (block_num - block_i - 1) // cycle_i
+                block_i += skip_cycles * cycle_i
+                skipped_height += skip_cycles * (height - last_seen_height)
+                signatures_seen = None
+            else:
+                signatures_seen[signature] = (block_i, height)
+
+        block_i += 1
+
+    return floor + len(tower) + skipped_height
+
+
+def solve(text):
+    moves = read_moves(text.strip())
+    shapes = make_shapes()
+    return (
+        simulate_packed(shapes, moves, block_num=2022),
+        simulate_packed(shapes, moves, block_num=1000000000000),
+    )
+
 
 if __name__ == '__main__':
     board = Board(width=7)
@@ -237,9 +363,9 @@ if __name__ == '__main__':
     print(' '.join([Move.to_symbol(move) for move in moves]))
     print()
 
-    simulate(board, shapes, moves, block_num=1000000000000, signature_size=3000)
+    height = simulate_packed(shapes, moves, block_num=1000000000000)
     #print('Board')
     #print(Field.show(board.fields[::-1]))
     #print()
     print('Result')
-    print(board.height)
+    print(height)
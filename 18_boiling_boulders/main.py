@@ -11,9 +11,12 @@ class Block:
     z: int
 
 
-def read_blocks():
+def read_blocks(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     blocks = []
-    for line in fileinput.input():
+    for line in lines:
         x, y, z = map(int, line.split(','))
         block = Block(x, y, z)
         blocks.append(block)
@@ -45,7 +48,22 @@ def calculate_surface_area(blocks):
         area += board[block.x][block.y + 1][block.z] == EXTERIOR_SYMBOL
         area += board[block.x][block.y - 1][block.z] == EXTERIOR_SYMBOL
         area += board[block.x][block.y][block.z + 1] == EXTERIOR_SYMBOL
-        area += board[block.x][block.y][block.z + 1] == EXTERIOR_SYMBOL
+        area += board[block.x][block.y][block.z - 1] == EXTERIOR_SYMBOL
+
+    return area
+
+
+def calculate_total_surface_area(blocks):
+    occupied = set((block.x, block.y, block.z) for block in blocks)
+
+    area = 0
+    for x, y, z in occupied:
+        area += (x + 1, y, z) not in occupied
+        area += (x - 1, y, z) not in occupied
+        area += (x, y + 1, z) not in occupied
+        area += (x, y - 1, z) not in occupied
+        area += (x, y, z + 1) not in occupied
+        area += (x, y, z - 1) not in occupied
 
     return area
 
@@ -77,6 +95,12 @@ def flood(board, start):
         if z < max_z - 1: 
             go(x, y, z + 1)
 
+
+def solve(text):
+    blocks = read_blocks(text.splitlines())
+    return calculate_total_surface_area(blocks), calculate_surface_area(blocks)
+
+
 if __name__ == '__main__':
     blocks = read_blocks()
     print(blocks)
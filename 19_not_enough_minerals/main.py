@@ -1,6 +1,8 @@
 import collections
+import concurrent.futures
 from dataclasses import dataclass
 import fileinput
+import functools
 import numpy as np
 import re
 from typing import List
@@ -19,7 +21,10 @@ class Blueprint:
     costs: np.ndarray
 
 
-def read_blueprints():
+def read_blueprints(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     blueprints = []
 
     ore_re = re.compile(r"Each ore robot costs (\d+) ore.")
@@ -27,7 +32,7 @@ def read_blueprints():
     obsidian_re = re.compile(r"Each obsidian robot costs (\d+) ore and (\d+) clay.")
     geode_re = re.compile(r"Each geode robot costs (\d+) ore and (\d+) obsidian.")
 
-    for line in fileinput.input():
+    for line in lines:
         costs = np.zeros((Resource.SIZE, Resource.SIZE))
         costs[Resource.ORE][Resource.ORE], = map(int, ore_re.search(line).groups())
         costs[Resource.CLAY][Resource.ORE], = map(int, clay_re.search(line).groups())
@@ -39,38 +44,75 @@ def read_blueprints():
     return blueprints
 
 
-def calculate_max_geodes(blueprint, time_limit):
-    np.seterr(divide='ignore', invalid='ignore')
-
-    costs = blueprint.costs
-
-    producers = np.zeros(Resource.SIZE)
-    producers[Resource.ORE] = 1
-    total_resources = np.zeros(Resource.SIZE)
-    resources = np.zeros(Resource.SIZE)
-    max_producers = costs.max(axis=0)
-    max_producers[-1] = np.inf
-    total_resources_cache = {}
-    best_geodes = [0]
-
-    def visit(time):
-        if time >= time_limit:
-            if best_geodes[0] < resources[Resource.GEODE]:
-                # print(f"{time:02d} {resources} {producers} fin")
-                best_geodes[0] = resources[Resource.GEODE]
-                #print(f"{best_geodes[0]}")
-
+class DominanceCache:
+    """Non-dominated resource vectors per (time, producers) key, with capped sizes."""
+
+    def __init__(self, max_entries=1000000, frontier_size=8):
+        self.max_entries = max_entries
+        self.frontier_size = frontier_size
+        self.frontiers = {}
+        self.entries = 0
+        self.checks = 0
+        self.prunes = 0
+        self.evictions = 0
+
+    def is_dominated(self, key, resources):
+        self.checks += 1
+        frontier = self.frontiers.get(key)
+        if frontier is None:
+            frontier = self.frontiers[key] = []
+        else:
+            for stored in frontier:
+                if stored[0] >= resources[0] and stored[1] >= resources[1] and stored[2] >= resources[2] and stored[3] >= resources[3]:
+                    self.prunes += 1
+                    return True
+
+        size = len(frontier)
+        frontier[:] = [stored for stored in frontier
+                       if not (resources[0] >= stored[0] and resources[1] >= stored[1] and resources[2] >= stored[2] and resources[3] >= stored[3])]
+        if len(frontier) >= self.frontier_size:
+            del frontier[0]
+        frontier.append(resources)
+        self.entries += len(frontier) - size
+
+        while self.entries > self.max_entries:
+            oldest_key = next(iter(self.frontiers))
+            self.entries -= len(self.frontiers.pop(oldest_key))
+            self.evictions += 1
+
+        return False
+
+    def stats(self):
+        return dict(
+            checks=self.checks,
+            prunes=self.prunes,
+            prune_rate=self.prunes / self.checks if self.checks else 0.0,
+            entries=self.entries,
+            evictions=self.evictions,
+        )
+
+
+def calculate_max_geodes(blueprint, time_limit, cache=None):
+    costs = [tuple(int(cost) for cost in cost_row) for cost_row in blueprint.costs]
+    max_producers = [max(cost_row[i] for cost_row in costs) for i in range(Resource.SIZE)]
+    max_producers[Resource.GEODE] = float('inf')
+    if cache is None:
+        cache = DominanceCache()
+    best_geodes = 0
+
+    def visit(time, producers, resources):
+        nonlocal best_geodes
         time_left = time_limit - time
 
-        cache_key = (time,) + tuple(producers)
-        cache_val = tuple(resources)
-        retrieved_cache_val = total_resources_cache.get(cache_key)
-        if retrieved_cache_val is not None and retrieved_cache_val[0] <= cache_val[0] and retrieved_cache_val[1] <= cache_val[1] and retrieved_cache_val[2] <= cache_val[2] and retrieved_cache_val[3] <= cache_val[3]:
+        final_geodes = resources[Resource.GEODE] + producers[Resource.GEODE] * time_left
+        if best_geodes < final_geodes:
+            best_geodes = final_geodes
+
+        if cache.is_dominated((time, producers), resources):
             return
-        total_resources_cache[cache_key] = cache_val
 
         possible_geodes = resources[Resource.GEODE] + time_left * (2 * producers[Resource.GEODE] + time_left - 1) // 2
-        if possible_geodes <= best_geodes[0]:
+        if possible_geodes <= best_geodes:
             return
 
         for resource_type in range(Resource.SIZE - 1, -1, -1):
@@ -80,32 +122,84 @@ def calculate_max_geodes(blueprint, time_limit):
                 continue
 
             cost_row = costs[resource_type]
-            resources_required = cost_row - resources
-            time_required = max(
-                0,
-                int(np.ceil(np.nan_to_num(resources_required / producers).max()))
-            ) + 1
-
-            if time + time_required >= time_limit:
-                continue
+            time_required = 0
+            for i in range(Resource.GEODE):
+                missing = cost_row[i] - resources[i]
+                if missing <= 0:
+                    continue
+                if producers[i] == 0:
+                    break
+                time_required = max(time_required, -(-missing // producers[i]))
+            else:
+                time_required += 1
+                if time + time_required >= time_limit:
+                    continue
+
+                new_resources = tuple(
+                    resources[i] + producers[i] * time_required - cost_row[i]
+                    for i in range(Resource.SIZE)
+                )
+                new_producers = producers[:resource_type] + (producers[resource_type] + 1,) + producers[resource_type + 1:]
+                visit(time + time_required, new_producers, new_resources)
+
+    visit(0, (1, 0, 0, 0), (0, 0, 0, 0))
+
+    return best_geodes
+
+
+def calculate_max_geodes_exhaustive(blueprint, time_limit):
+    """Breadth-first search over every state, for checking `calculate_max_geodes`."""
+    # Only safe reductions: no more non-geode robots than any robot costs of
+    # that resource, and no more stock than can still be spent.
+    costs = [tuple(int(cost) for cost in cost_row) for cost_row in blueprint.costs]
+    max_producers = [max(cost_row[i] for cost_row in costs) for i in range(Resource.GEODE)]
+
+    states = {((1, 0, 0, 0), (0, 0, 0, 0))}
+    for time in range(time_limit):
+        time_left = time_limit - time
+        new_states = set()
+        for producers, resources in states:
+            options = [None] + [
+                resource_type for resource_type in range(Resource.SIZE)
+                if all(resources[i] >= costs[resource_type][i] for i in range(Resource.GEODE))
+                and (resource_type == Resource.GEODE or producers[resource_type] < max_producers[resource_type])
+            ]
+            for resource_type in options:
+                new_producers = producers
+                new_resources = [resources[i] + producers[i] for i in range(Resource.SIZE)]
+                if resource_type is not None:
+                    new_producers = producers[:resource_type] + (producers[resource_type] + 1,) + producers[resource_type + 1:]
+                    for i in range(Resource.GEODE):
+                        new_resources[i] -= costs[resource_type][i]
+                for i in range(Resource.GEODE):
+                    new_resources[i] = min(new_resources[i], max_producers[i] * (time_left - 1))
+                new_states.add((new_producers, tuple(new_resources)))
+        states = new_states
+
+    return max(resources[Resource.GEODE] for _, resources in states)
+
+
+def calculate_all_max_geodes(blueprints, time_limit, workers=None):
+    calculate = functools.partial(calculate_max_geodes, time_limit=time_limit)
+    if workers == 1 or len(blueprints) <= 1:
+        return list(map(calculate, blueprints))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(calculate, blueprints))
+
+
+def solve(text, workers=1):
+    blueprints = read_blueprints(text.splitlines())
 
-            total_resources[:] += producers * time_required
-            resources[:] += producers * time_required
-            resources[:] -= cost_row
-            producers[resource_type] += 1
-            visit(time + time_required)
-            producers[resource_type] -= 1
-            resources[:] += cost_row
-            resources[:] -= producers * time_required
-            total_resources[:] -= producers * time_required
+    quality = 0
+    geodes = calculate_all_max_geodes(blueprints, time_limit=24, workers=workers)
+    for i, blueprint_geodes in enumerate(geodes):
+        quality += (i + 1) * blueprint_geodes
 
-        final_geodes = resources[Resource.GEODE] + producers[Resource.GEODE] * time_left
-        if best_geodes[0] <= final_geodes:
-            best_geodes[0] = final_geodes
-    
-    visit(0)
+    product = 1
+    for blueprint_geodes in calculate_all_max_geodes(blueprints[:3], time_limit=32, workers=workers):
+        product *= blueprint_geodes
 
-    return best_geodes[0]
+    return quality, product
 
 
 if __name__ == '__main__':
@@ -114,8 +208,9 @@ if __name__ == '__main__':
 
     quality = 0
     for i, blueprint in enumerate(blueprints):
-        geodes = calculate_max_geodes(blueprint, time_limit=32)
-        print(i, geodes)
+        cache = DominanceCache()
+        geodes = calculate_max_geodes(blueprint, time_limit=32, cache=cache)
+        print(i, geodes, cache.stats())
         quality += (i + 1) * geodes
 
     print(quality)
@@ -1,3 +1,4 @@
+from array import array
 from dataclasses import dataclass
 import fileinput
 
@@ -9,9 +10,12 @@ class Node:
     next = None
 
 
-def read_code():
+def read_code(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     nodes = []
-    for line in fileinput.input():
+    for line in lines:
         value = int(line)
         node = Node(value)
         nodes.append(node)
@@ -72,6 +76,204 @@ def display(nodes):
     print()
 
 
+def find_grove_coordinates(nodes):
+    zero_node = find(nodes, value=0)
+    length = len(nodes)
+    return [
+        get_nth(zero_node, 1000 % length).value,
+        get_nth(zero_node, 2000 % length).value,
+        get_nth(zero_node, 3000 % length).value,
+    ]
+
+
+@dataclass
+class LinkedCode:
+    """The circular list of `Node`s as three int64 arrays indexed by original position."""
+    values: array
+    prev: array
+    next: array
+
+    @classmethod
+    def from_values(cls, values):
+        values = array('q', values)
+        length = len(values)
+        prev = array('q', range(-1, length - 1))
+        next = array('q', range(1, length + 1))
+        if length:
+            prev[0] = length - 1
+            next[-1] = 0
+        return cls(values, prev, next)
+
+    def __len__(self):
+        return len(self.values)
+
+    def move(self, i, by):
+        if by == 0:
+            return
+        prev, next = self.prev, self.next
+
+        before, after = prev[i], next[i]
+        next[before], prev[after] = after, before
+
+        target_before = before
+        if by > 0:
+            for j in range(by):
+                target_before = next[target_before]
+        else:
+            for j in range(-by):
+                target_before = prev[target_before]
+
+        target_after = next[target_before]
+        next[target_before], prev[i] = i, target_before
+        prev[target_after], next[i] = i, target_after
+
+    def reorder(self):
+        length = len(self.values)
+        if length < 2:
+            return
+        for i, value in enumerate(self.values):
+            # Walk whichever way round the circle of the others is shorter.
+            places = value % (length - 1)
+            if places > (length - 1) // 2:
+                places -= length - 1
+            self.move(i, places)
+
+    def find(self, value):
+        return self.values.index(value)
+
+    def get_nth(self, i, n):
+        for j in range(n):
+            i = self.next[i]
+        return i
+
+    def find_grove_coordinates(self):
+        zero_i = self.find(0)
+        length = len(self.values)
+        return [self.values[self.get_nth(zero_i, n % length)] for n in (1000, 2000, 3000)]
+
+
+def read_linked_code(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+    return LinkedCode.from_values(int(line) for line in lines)
+
+
+class BlockedList:
+    """A list of the ints 0..n-1 in blocks of about sqrt(n), block lengths in a Fenwick tree."""
+
+    def __init__(self, items, block_size=None):
+        items = list(items)
+        self.block_size = block_size or max(16, int(len(items) ** 0.5))
+        self.blocks = [
+            items[i:i + self.block_size] for i in range(0, len(items), self.block_size)
+        ] or [[]]
+        self.block_of = [None] * len(items)
+        for block in self.blocks:
+            for item in block:
+                self.block_of[item] = block
+        self.build_tree()
+
+    def build_tree(self):
+        size = len(self.blocks)
+        self.tree = [0] * (size + 1)
+        for i, block in enumerate(self.blocks, start=1):
+            self.tree[i] += len(block)
+            parent = i + (i & -i)
+            if parent <= size:
+                self.tree[parent] += self.tree[i]
+        self.top_bit = 1 << (size.bit_length() - 1)
+
+    def add_length(self, block_i, diff):
+        i = block_i + 1
+        while i < len(self.tree):
+            self.tree[i] += diff
+            i += i & -i
+
+    def count_before(self, block_i):
+        count = 0
+        i = block_i
+        while i > 0:
+            count += self.tree[i]
+            i -= i & -i
+        return count
+
+    def __len__(self):
+        return self.count_before(len(self.blocks))
+
+    def __iter__(self):
+        for block in self.blocks:
+            yield from block
+
+    def index(self, item):
+        block = self.block_of[item]
+        # list.index compares by identity first, so this finds the very block.
+        block_i = self.blocks.index(block)
+        return self.count_before(block_i) + block.index(item)
+
+    def locate(self, pos):
+        """Block index and offset of `pos`, or the end of the last block past the end."""
+        block_i = 0
+        step = self.top_bit
+        while step:
+            if block_i + step < len(self.tree) and self.tree[block_i + step] <= pos:
+                block_i += step
+                pos -= self.tree[block_i]
+            step >>= 1
+        if block_i == len(self.blocks):
+            return block_i - 1, len(self.blocks[-1])
+        return block_i, pos
+
+    def remove_at(self, pos):
+        block_i, offset = self.locate(pos)
+        item = self.blocks[block_i].pop(offset)
+        self.add_length(block_i, -1)
+        return item
+
+    def insert_at(self, pos, item):
+        block_i, offset = self.locate(pos)
+        block = self.blocks[block_i]
+        block.insert(offset, item)
+        self.block_of[item] = block
+        self.add_length(block_i, 1)
+
+        if len(block) > 2 * self.block_size:
+            tail = block[self.block_size:]
+            del block[self.block_size:]
+            for moved in tail:
+                self.block_of[moved] = tail
+            self.blocks.insert(block_i + 1, tail)
+            self.build_tree()
+
+
+def mix(values, loops=1, block_size=None):
+    """Mixes the values `loops` times and returns them in their final order."""
+    length = len(values)
+    order = BlockedList(range(length), block_size)
+    if length > 1:
+        for i in range(loops):
+            for item, value in enumerate(values):
+                pos = order.index(item)
+                order.remove_at(pos)
+                order.insert_at((pos + value) % (length - 1), item)
+    return [values[item] for item in order]
+
+
+def find_mixed_grove_coordinates(mixed):
+    zero_pos = mixed.index(0)
+    length = len(mixed)
+    return [mixed[(zero_pos + n) % length] for n in (1000, 2000, 3000)]
+
+
+def decrypt(lines, key, loops):
+    values = [int(line) * key for line in lines if line.strip()]
+    return sum(find_mixed_grove_coordinates(mix(values, loops)))
+
+
+def solve(text):
+    lines = text.splitlines()
+    return decrypt(lines, key=1, loops=1), decrypt(lines, key=811589153, loops=10)
+
+
 if __name__ == '__main__':
     nodes = read_code()
 
@@ -82,16 +284,9 @@ if __name__ == '__main__':
         node.value *= key
 
     display(nodes)
-    for i in range(loops):
-        reorder(nodes)
+    mixed = mix([node.value for node in nodes], loops)
 
-    zero_node = find(nodes, value=0)
-    length = len(nodes)
-    result = [
-        get_nth(zero_node, 1000 % length).value,
-        get_nth(zero_node, 2000 % length).value,
-        get_nth(zero_node, 3000 % length).value,
-    ]
+    result = find_mixed_grove_coordinates(mixed)
     print(result)
     print(sum(result))
 
@@ -1,7 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import fileinput
+from fractions import Fraction
+import heapq
+import operator
 import re
-from typing import Dict, List, Protocol
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
 
 
 class Expression(Protocol):
@@ -89,20 +92,25 @@ class BinRel(Expression):
     def evaluate(self, environment: Dict[str, Expression]) -> Expression:
         a_val = environment[self.a.name]
         b_val = environment[self.b.name]
-        
+        if isinstance(a_val, Const):
+            a_val, b_val = b_val, a_val
+
         while isinstance(a_val, BinOp) and isinstance(b_val, Const) and a_val.can_invert():
             a_val, b_val = a_val.invert(b_val)
 
         return BinRel(a_val, b_val, self.op)
 
 
-def read_input(alt_mode=True):
+def read_input(alt_mode=True, lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     MONKEY_CONST_RE = re.compile(r"([a-z]{4}): (\d+)")
     MONKEY_BINOP_RE = re.compile(r"([a-z]{4}): ([a-z]{4}) (.) ([a-z]{4})")
 
     monkeys = {}
 
-    for line in fileinput.input():
+    for line in lines:
         line = line.strip()
         if match := MONKEY_CONST_RE.match(line):
             key, value = match.groups()
@@ -146,6 +154,203 @@ def evaluate(monkeys):
     return environment
 
 
+OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.floordiv,
+    '=': operator.eq,
+}
+
+
+@dataclass
+class Program:
+    """Monkeys compiled to (slot, function, slot_a, slot_b) ops, dependencies first."""
+    slots: Dict[str, int]
+    initial: List[Optional[int]]
+    ops: List[Tuple[int, Callable[[int, int], int], int, int]]
+    affected: Dict[int, List[int]] = field(default_factory=dict)
+
+    def evaluate(self, leaves=None):
+        values = list(self.initial)
+        for name, value in (leaves or {}).items():
+            values[self.slots[name]] = value
+        for slot, function, a, b in self.ops:
+            values[slot] = function(values[a], values[b])
+        return values
+
+    def affected_ops(self, name):
+        """Indices of the ops whose value depends on the leaf `name`, in order."""
+        leaf = self.slots[name]
+        if leaf not in self.affected:
+            dirty = {leaf}
+            indices = []
+            for i, (slot, function, a, b) in enumerate(self.ops):
+                if a in dirty or b in dirty:
+                    dirty.add(slot)
+                    indices.append(i)
+            self.affected[leaf] = indices
+        return self.affected[leaf]
+
+    def reevaluate(self, values, leaves):
+        """Values after changing some leaves, running only the ops that depend on them."""
+        values = list(values)
+        indices = set()
+        for name, value in leaves.items():
+            values[self.slots[name]] = value
+            indices.update(self.affected_ops(name))
+        for i in sorted(indices):
+            slot, function, a, b = self.ops[i]
+            values[slot] = function(values[a], values[b])
+        return values
+
+
+def compile_monkeys(monkeys):
+    """Orders the monkeys so that every one comes after the two it listens to."""
+    # `Var` monkeys get no initial value, so they have to be given as leaves.
+    slots = {name: slot for slot, name in enumerate(monkeys)}
+    initial = [
+        monkey.value if isinstance(monkey, Const) else None for monkey in monkeys.values()
+    ]
+    ops = []
+
+    done = set()
+    for name in monkeys:
+        stack = [(name, False)]
+        while stack:
+            name, children_done = stack.pop()
+            if name in done:
+                continue
+            monkey = monkeys[name]
+            if not isinstance(monkey, (BinOp, BinRel)):
+                done.add(name)
+            elif children_done:
+                done.add(name)
+                ops.append((slots[name], OPERATORS[monkey.op],
+                            slots[monkey.a.name], slots[monkey.b.name]))
+            else:
+                stack.append((name, True))
+                stack.append((monkey.b.name, False))
+                stack.append((monkey.a.name, False))
+
+    return Program(slots, initial, ops)
+
+
+class IncrementalEvaluator:
+    """Keeps every monkey's value and reruns only the ops a changed leaf reaches."""
+
+    def __init__(self, monkeys):
+        self.program = compile_monkeys(monkeys)
+        self.values = self.program.evaluate()
+        self.readers = [[] for i in range(len(self.values))]
+        self.computed = set()
+        for i, (slot, function, a, b) in enumerate(self.program.ops):
+            self.readers[a].append(i)
+            if b != a:
+                self.readers[b].append(i)
+            self.computed.add(slot)
+
+    def __getitem__(self, name):
+        return self.values[self.program.slots[name]]
+
+    def update(self, leaves):
+        """Sets the given leaf values and returns the number of ops rerun."""
+        ops = self.program.ops
+        values = self.values
+        queue = []
+        queued = set()
+
+        def enqueue(slot):
+            for i in self.readers[slot]:
+                if i not in queued:
+                    queued.add(i)
+                    heapq.heappush(queue, i)
+
+        for name, value in leaves.items():
+            slot = self.program.slots[name]
+            if slot in self.computed:
+                raise ValueError(f"Monkey '{name}' is not a leaf")
+            if values[slot] != value:
+                values[slot] = value
+                enqueue(slot)
+
+        recomputed = 0
+        while queue:
+            i = heapq.heappop(queue)
+            slot, function, a, b = ops[i]
+            value = function(values[a], values[b])
+            recomputed += 1
+            if value != values[slot]:
+                values[slot] = value
+                enqueue(slot)
+
+        return recomputed
+
+
+# Linear forms are (a, b) pairs standing for a·x + b. The coefficients stay
+# ints while divisions come out whole and only become Fractions when not.
+
+def divide_exact(x, y):
+    if isinstance(x, int) and isinstance(y, int) and x % y == 0:
+        return x // y
+    return Fraction(x) / y
+
+
+def add_linear(p, q):
+    return p[0] + q[0], p[1] + q[1]
+
+
+def sub_linear(p, q):
+    return p[0] - q[0], p[1] - q[1]
+
+
+def mul_linear(p, q):
+    if p[0] and q[0]:
+        raise ValueError('Product of two forms with the unknown is not linear')
+    return p[0] * q[1] + q[0] * p[1], p[1] * q[1]
+
+
+def div_linear(p, q):
+    if q[0]:
+        raise ValueError('Division by a form with the unknown is not linear')
+    return divide_exact(p[0], q[1]), divide_exact(p[1], q[1])
+
+
+def solve_equal_linear(p, q):
+    if p[0] == q[0]:
+        raise ValueError('Equation does not have a single solution')
+    return Fraction(q[1] - p[1]) / (p[0] - q[0])
+
+
+LINEAR_OPERATORS = {
+    operator.add: add_linear,
+    operator.sub: sub_linear,
+    operator.mul: mul_linear,
+    operator.floordiv: div_linear,
+    operator.eq: solve_equal_linear,
+}
+
+
+def solve_linear(monkeys, unknown='humn', relation='root'):
+    """Solves the `relation` equality for the `unknown` monkey as a Fraction."""
+    program = compile_monkeys(monkeys)
+    forms = [None if value is None else (0, value) for value in program.initial]
+    forms[program.slots[unknown]] = (1, 0)
+    for slot, function, a, b in program.ops:
+        forms[slot] = LINEAR_OPERATORS[function](forms[a], forms[b])
+    return forms[program.slots[relation]]
+
+
+def solve(text):
+    lines = text.splitlines()
+    program = compile_monkeys(read_input(alt_mode=False, lines=lines))
+    part1 = program.evaluate()[program.slots['root']]
+    humn = solve_linear(read_input(alt_mode=True, lines=lines))
+    if humn.denominator != 1:
+        raise ValueError(f'humn has to yell {humn}, which is not a whole number')
+    return part1, int(humn)
+
+
 if __name__ == '__main__':
     monkeys = read_input()
     print(monkeys)
@@ -121,7 +121,7 @@ class RegionMapping:
 
 
 class Texture:
-    def __init__(self, fields, size):
+    def __init__(self, fields, size, verbose=False):
         self.fields = fields
         self.size = size
 
@@ -194,9 +194,10 @@ class Texture:
         for mapping in mappings.values():
             cube_point = tuple(mapping.cube_position.coords)
             cube_to_texture_mapping[cube_point] = mapping
-        print(sorted(cube_to_texture_mapping.keys()))
-        print(len(cube_to_texture_mapping))
-        print(cube_to_texture_mapping[(0, 0, -1)])
+        if verbose:
+            print(sorted(cube_to_texture_mapping.keys()))
+            print(len(cube_to_texture_mapping))
+            print(cube_to_texture_mapping[(0, 0, -1)])
         self.cube_to_texture_mapping = cube_to_texture_mapping
 
     def cube_to_texture_coords(self, x, y, z):
@@ -228,8 +229,8 @@ class Board:
         self.texture = texture
 
     def first_position(self):
-        for y in range(size):
-            for x in range(size):
+        for y in range(self.size):
+            for x in range(self.size):
                 field = self.texture.get_field(y=y, x=x, z=-1)
                 if field == Field.FLOOR:
                     return Position.initial(y=y, x=x)
@@ -243,11 +244,14 @@ class Board:
                 position.step(times=1, size=self.size)
 
 
-def read_input():
+def read_input(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     fields = []
 
     read_phase = 0
-    for line in fileinput.input():
+    for line in lines:
         line = line.rstrip()
         if line == '':
             read_phase = 1
@@ -271,10 +275,12 @@ def guess_size(fields):
     return size
 
 
-def simulate(board, position, instructions):
-    print(f'init {position}')
+def simulate(board, position, instructions, verbose=False):
+    if verbose:
+        print(f'init {position}')
     for instruction in instructions:
-        print(f'executing {instruction}')
+        if verbose:
+            print(f'executing {instruction}')
         if instruction.isnumeric():
             steps = int(instruction)
             board.move(position, steps)
@@ -282,11 +288,60 @@ def simulate(board, position, instructions):
             position.rotate(instruction)
         else:
             raise ValueError(f'unknown instruction {instruction}')
-        print(position)
+        if verbose:
+            print(position)
 
     return position
 
 
+def simulate_flat(fields, instructions):
+    # right, down, left, up - the same order as the password facing values
+    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+    def get_field(y, x):
+        if 0 <= y < len(fields) and 0 <= x < len(fields[y]):
+            return fields[y][x]
+        return Field.VOID
+
+    y, x = 0, fields[0].index(Field.FLOOR)
+    facing = 0
+    for instruction in instructions:
+        if instruction == Rotation.RIGHT:
+            facing = (facing + 1) % 4
+        elif instruction == Rotation.LEFT:
+            facing = (facing - 1) % 4
+        elif instruction.isnumeric():
+            dy, dx = directions[facing]
+            for step in range(int(instruction)):
+                n_y, n_x = y + dy, x + dx
+                if get_field(n_y, n_x) == Field.VOID:
+                    n_y, n_x = y, x
+                    while get_field(n_y - dy, n_x - dx) != Field.VOID:
+                        n_y, n_x = n_y - dy, n_x - dx
+                if get_field(n_y, n_x) == Field.WALL:
+                    break
+                y, x = n_y, n_x
+        else:
+            raise ValueError(f'unknown instruction {instruction}')
+
+    return 1000 * (y + 1) + 4 * (x + 1) + facing
+
+
+def solve(text):
+    fields, instructions = read_input(text.splitlines())
+    part1 = simulate_flat(fields, instructions)
+
+    size = guess_size(fields)
+    texture = Texture(fields=fields, size=size)
+    board = Board(size=size, texture=texture)
+    position = simulate(board, board.first_position(), instructions)
+    texture_y, texture_x = texture.cube_to_texture_coords(*position.coords)
+    texture_direction = texture.cube_to_texture_direction(position)
+    part2 = 1000 * (texture_y + 1) + 4 * (texture_x + 1) + texture_direction
+
+    return part1, part2
+
+
 if __name__ == '__main__':
     fields, instructions = read_input()
     print(Field.show(fields))
@@ -294,11 +349,11 @@ if __name__ == '__main__':
     size = guess_size(fields)
     print('size', size)
 
-    texture = Texture(fields=fields, size=size)
+    texture = Texture(fields=fields, size=size, verbose=True)
     board = Board(size=size, texture=texture)
 
     position = board.first_position()
-    position = simulate(board, position, instructions)
+    position = simulate(board, position, instructions, verbose=True)
 
     texture_y, texture_x = texture.cube_to_texture_coords(*position.coords)
     texture_direction = texture.cube_to_texture_direction(position)
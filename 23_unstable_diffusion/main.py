@@ -1,11 +1,16 @@
 import collections
+from dataclasses import dataclass
 import fileinput
+import numpy as np
 
 
-def read_input():
+def read_input(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     elves = set()
 
-    for y, line in enumerate(fileinput.input()):
+    for y, line in enumerate(lines):
         line = line.strip()
         for x, symbol in enumerate(line):
             if symbol == '#':
@@ -43,7 +48,7 @@ def simulate(elves, rounds):
 
         if not active_elves:
             print(f'no active in round {r}')
-            return elves
+            return elves, r + 1
 
         propositions = collections.defaultdict(int)
         for elf in active_elves:
@@ -71,16 +76,150 @@ def simulate(elves, rounds):
         elves = new_elves
         moves = moves[1:] + [moves[0]]
         print('round', r + 1, len(elves))
-    return elves
+    return elves, None
 
 
-if __name__ == '__main__':
-    elves = read_input()
-    elves = simulate(elves, rounds=10000)
+@dataclass
+class RoundStats:
+    examined: int
+    moved: int
+
+
+def simulate_frontier(elves, rounds, stats=None):
+    """Same as `simulate`, looking only at the elves that may want to move."""
+    # An elf with no neighbours keeps having none until something moves next
+    # to it. `stats` gets a `RoundStats` for every round.
+    surrounding = [
+        (-1, -1), (-1, 0), (-1, 1),
+        ( 0, -1),          ( 0, 1),
+        ( 1, -1), ( 1, 0), ( 1, 1),
+    ]
+    moves = [
+        [(-1, -1), (-1,  0), (-1,  1)],
+        [( 1, -1), ( 1,  0), ( 1,  1)],
+        [(-1, -1), ( 0, -1), ( 1, -1)],
+        [(-1,  1), ( 0,  1), ( 1,  1)],
+    ]
+
+    elves = set(elves)
+    frontier = set(elves)
+    for r in range(rounds):
+        examined = [elf for elf in frontier if elf in elves]
+        active = [elf for elf in examined
+                  if any((elf[0] + s[0], elf[1] + s[1]) in elves for s in surrounding)]
+        if not active:
+            if stats is not None:
+                stats.append(RoundStats(examined=len(examined), moved=0))
+            return elves, r + 1
+
+        proposals = {}
+        for elf in active:
+            for move in moves:
+                if all((elf[0] + m[0], elf[1] + m[1]) not in elves for m in move):
+                    mid = move[1]
+                    proposals[elf] = (elf[0] + mid[0], elf[1] + mid[1])
+                    break
+        picked = collections.Counter(proposals.values())
+
+        frontier = set(active)
+        moved = 0
+        for elf, new_elf in proposals.items():
+            if picked[new_elf] != 1:
+                continue
+            elves.remove(elf)
+            elves.add(new_elf)
+            frontier.discard(elf)
+            for cell in (elf, new_elf):
+                frontier.update((cell[0] + s[0], cell[1] + s[1]) for s in surrounding)
+            frontier.add(new_elf)
+            moved += 1
 
+        if stats is not None:
+            stats.append(RoundStats(examined=len(examined), moved=moved))
+        moves = moves[1:] + [moves[0]]
+
+    return elves, None
+
+
+def shifted(grid, dy, dx):
+    """Copy of the grid moved by (dy, dx), with what comes in from outside empty."""
+    height, width = grid.shape
+    result = np.zeros_like(grid)
+    result[max(dy, 0):height + min(dy, 0), max(dx, 0):width + min(dx, 0)] = \
+        grid[max(-dy, 0):height - max(dy, 0), max(-dx, 0):width - max(dx, 0)]
+    return result
+
+
+def simulate_dense(elves, rounds, margin=16):
+    """Same as `simulate`, on a boolean grid where every step works on all elves."""
+    # Two elves can only pick the same cell from opposite sides, so a cell
+    # picked more than once cancels both moves.
+    ys = [elf[0] for elf in elves]
+    xs = [elf[1] for elf in elves]
+    origin_y, origin_x = min(ys) - margin, min(xs) - margin
+    grid = np.zeros((max(ys) - origin_y + margin + 1, max(xs) - origin_x + margin + 1),
+                    dtype=bool)
+    grid[np.array(ys) - origin_y, np.array(xs) - origin_x] = True
+
+    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    stable_round = None
+    for r in range(rounds):
+        if grid[0].any() or grid[-1].any() or grid[:, 0].any() or grid[:, -1].any():
+            grid = np.pad(grid, margin)
+            origin_y -= margin
+            origin_x -= margin
+
+        taken = {(dy, dx): shifted(grid, -dy, -dx)
+                 for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx}
+        active = grid & np.logical_or.reduce(list(taken.values()))
+        if not active.any():
+            stable_round = r + 1
+            break
+
+        proposals = []
+        waiting = active
+        for dy, dx in directions:
+            if dy:
+                blocked = taken[dy, -1] | taken[dy, 0] | taken[dy, 1]
+            else:
+                blocked = taken[-1, dx] | taken[0, dx] | taken[1, dx]
+            proposed = waiting & ~blocked
+            waiting = waiting & blocked
+            proposals.append((dy, dx, proposed))
+
+        targets = [shifted(proposed, dy, dx) for dy, dx, proposed in proposals]
+        picked = np.add.reduce([target.astype(np.int8) for target in targets])
+        unique = picked == 1
+        for (dy, dx, proposed), target in zip(proposals, targets):
+            grid &= ~(proposed & shifted(unique, -dy, -dx))
+            grid |= target & unique
+
+        directions = directions[1:] + directions[:1]
+
+    ys, xs = np.nonzero(grid)
+    elves = {(int(y) + origin_y, int(x) + origin_x) for y, x in zip(ys, xs)}
+    return elves, stable_round
+
+
+def count_empty_ground(elves):
     y_min = min(elf[0] for elf in elves)
     y_max = max(elf[0] for elf in elves)
     x_min = min(elf[1] for elf in elves)
     x_max = max(elf[1] for elf in elves)
-    print(y_min, y_max, x_min, x_max, len(elves))
-    print((x_max - x_min + 1) * (y_max - y_min + 1) - len(elves))
+    return (x_max - x_min + 1) * (y_max - y_min + 1) - len(elves)
+
+
+def solve(text):
+    elves = read_input(text.splitlines())
+    moved_elves, stable_round = simulate_dense(elves, rounds=10)
+    part1 = count_empty_ground(moved_elves)
+    moved_elves, stable_round = simulate_dense(elves, rounds=10000)
+    return part1, stable_round
+
+
+if __name__ == '__main__':
+    elves = read_input()
+    elves, stable_round = simulate_dense(elves, rounds=10000)
+    print('stable round', stable_round)
+
+    print(count_empty_ground(elves))
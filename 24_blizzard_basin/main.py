@@ -3,6 +3,7 @@ from dataclasses import dataclass
 import fileinput
 import math
 import heapq
+import time
 
 
 class Field:
@@ -54,10 +55,13 @@ class Field:
         return '\n'.join(lines)
 
 
-def read_input():
+def read_input(lines=None):
+    if lines is None:
+        lines = fileinput.input()
+
     fields = []
 
-    for line in fileinput.input():
+    for line in lines:
         line = line.rstrip()
         if '##' in line:
             continue
@@ -140,24 +144,189 @@ def find_end_time(states, min_t, start_y, start_x, end_y, end_x):
         visit(t + 1, y, x)
 
 
-if __name__ == '__main__':
-    fields = read_input()
-    print(Field.show(fields))
-    print()
-
-    states = generate_states(fields)
-    print('state num', len(states))
-
+def find_trip_times(states):
     state_num, height, width = len(states), len(states[0]), len(states[0][0])
     end0_t = find_end_time(
         states, min_t=1, start_y=0, start_x=0, end_y=height-1, end_x=width-1
     ) + 1
-    print('end0_t', end0_t)
     end1_t = find_end_time(
         states, min_t=end0_t+1, start_y=height-1, start_x=width-1, end_y=0, end_x=0
     ) + 1
-    print('end1_t', end1_t)
     end2_t = find_end_time(
         states, min_t=end1_t+1, start_y=0, start_x=0, end_y=height-1, end_x=width-1
     ) + 1
-    print('end2_t', end2_t)
+    return end0_t, end1_t, end2_t
+
+
+def rotate(mask, by, width):
+    by %= width
+    return ((mask << by) | (mask >> (width - by))) & ((1 << width) - 1)
+
+
+@dataclass
+class Blizzards:
+    """Blizzards as one bitmask per row and direction, bit x standing for column x."""
+    height: int
+    width: int
+    right: list
+    left: list
+    up: list
+    down: list
+
+    @classmethod
+    def from_fields(cls, fields):
+        height, width = len(fields), len(fields[0])
+        masks = {field: [0] * height
+                 for field in (Field.RIGHT, Field.LEFT, Field.UP, Field.DOWN)}
+        for y, row in enumerate(fields):
+            for x, field in enumerate(row):
+                if field in masks:
+                    masks[field][y] |= 1 << x
+        return cls(height, width, masks[Field.RIGHT], masks[Field.LEFT],
+                   masks[Field.UP], masks[Field.DOWN])
+
+    def occupied(self, y, t):
+        return (rotate(self.right[y], t, self.width)
+                | rotate(self.left[y], -t, self.width)
+                | self.up[(y + t) % self.height]
+                | self.down[(y - t) % self.height])
+
+
+def find_end_time_bits(blizzards, min_t, start_y, start_x, end_y, end_x):
+    """Same as `find_end_time`, moving the set of all reachable cells at once."""
+    height, width = blizzards.height, blizzards.width
+    period = math.lcm(height, width)
+    full = (1 << width) - 1
+    end_bit = 1 << end_x
+
+    reachable = [0] * height
+    count_by_phase = {}
+    t = min_t
+    while True:
+        free = [full & ~blizzards.occupied(y, t) for y in range(height)]
+        reachable = spread_reachable(reachable, free, start_y, 1 << start_x)
+        if reachable[end_y] & end_bit:
+            return t
+        # The set at a phase only grows from one period to the next, so an
+        # unchanged count means an unchanged set.
+        count = count_reachable(reachable)
+        if count_by_phase.get(t % period) == count:
+            raise ValueError(f'({end_y}, {end_x}) cannot be reached from ({start_y}, {start_x})')
+        count_by_phase[t % period] = count
+        t += 1
+
+
+def count_reachable(reachable):
+    return sum(row.bit_count() for row in reachable)
+
+
+def spread_reachable(reachable, free, enter_y=None, enter_bit=0):
+    """Row masks of the cells reachable a minute later, given the free cells then."""
+    height = len(reachable)
+    spread = []
+    for y in range(height):
+        row = reachable[y]
+        cells = row | (row << 1) | (row >> 1)
+        if y > 0:
+            cells |= reachable[y - 1]
+        if y < height - 1:
+            cells |= reachable[y + 1]
+        if y == enter_y:
+            cells |= enter_bit
+        spread.append(cells & free[y])
+    return spread
+
+
+def find_trip_times_bits(blizzards):
+    height, width = blizzards.height, blizzards.width
+    end0_t = find_end_time_bits(
+        blizzards, min_t=1, start_y=0, start_x=0, end_y=height-1, end_x=width-1
+    ) + 1
+    end1_t = find_end_time_bits(
+        blizzards, min_t=end0_t+1, start_y=height-1, start_x=width-1, end_y=0, end_x=0
+    ) + 1
+    end2_t = find_end_time_bits(
+        blizzards, min_t=end1_t+1, start_y=0, start_x=0, end_y=height-1, end_x=width-1
+    ) + 1
+    return end0_t, end1_t, end2_t
+
+
+@dataclass
+class Leg:
+    start: tuple
+    end: tuple
+    start_t: int
+    end_t: int
+    seconds: float
+
+
+class TripPlanner:
+    """Plans trips between gates, sharing the free cells per phase of lcm(height, width)."""
+
+    def __init__(self, blizzards):
+        self.blizzards = blizzards
+        self.period = math.lcm(blizzards.height, blizzards.width)
+        self.free_by_phase = {}
+
+    def free_rows(self, t):
+        phase = t % self.period
+        if phase not in self.free_by_phase:
+            blizzards = self.blizzards
+            full = (1 << blizzards.width) - 1
+            self.free_by_phase[phase] = [
+                full & ~blizzards.occupied(y, phase) for y in range(blizzards.height)
+            ]
+        return self.free_by_phase[phase]
+
+    def plan(self, waypoints, start_t=1):
+        """Returns a `Leg` for each pair of waypoint gates, moving one reachable set through time."""
+        legs = []
+        height = self.blizzards.height
+        reachable = [0] * height
+        count_by_phase = {}
+        leg_start_t = start_t
+        leg_timer = time.perf_counter()
+        t = start_t
+        leg_i = 0
+        while leg_i < len(waypoints) - 1:
+            (start_y, start_x), (end_y, end_x) = waypoints[leg_i], waypoints[leg_i + 1]
+            reachable = spread_reachable(reachable, self.free_rows(t), start_y, 1 << start_x)
+            if reachable[end_y] & (1 << end_x):
+                now = time.perf_counter()
+                legs.append(Leg(waypoints[leg_i], waypoints[leg_i + 1],
+                                leg_start_t, t + 1, now - leg_timer))
+                leg_timer = now
+                reachable = [0] * height
+                count_by_phase = {}
+                leg_start_t = t + 2
+                leg_i += 1
+                t += 2
+            else:
+                # Same check as in find_end_time_bits.
+                count = count_reachable(reachable)
+                if count_by_phase.get(t % self.period) == count:
+                    raise ValueError(f'gate {waypoints[leg_i + 1]} cannot be reached '
+                                     f'from {waypoints[leg_i]} after minute {leg_start_t}')
+                count_by_phase[t % self.period] = count
+                t += 1
+        return legs
+
+
+def solve(text):
+    fields = read_input(text.splitlines())
+    blizzards = Blizzards.from_fields(fields)
+    start, end = (0, 0), (blizzards.height - 1, blizzards.width - 1)
+    legs = TripPlanner(blizzards).plan([start, end, start, end])
+    return legs[0].end_t, legs[2].end_t
+
+
+if __name__ == '__main__':
+    fields = read_input()
+    print(Field.show(fields))
+    print()
+
+    blizzards = Blizzards.from_fields(fields)
+    start, end = (0, 0), (blizzards.height - 1, blizzards.width - 1)
+    for leg in TripPlanner(blizzards).plan([start, end, start, end]):
+        print(f'{leg.start} -> {leg.end}: from {leg.start_t} to {leg.end_t} '
+              f'({leg.seconds * 1000:.1f} ms)')
@@ -43,6 +43,11 @@ def num_to_code(num):
     return ''.join(digits[::-1])
 
 
+def solve(text):
+    total_num = sum(code_to_num(code) for code in text.split())
+    return num_to_code(total_num), None
+
+
 if __name__ == '__main__':
     total_num = 0
     for line in fileinput.input():
@@ -0,0 +1,473 @@
+"""Benchmark every day's solvers on synthetic inputs of growing size.
+
+    python -m harness.benchmark --days 16 19 --scales 1 10 100 --output benchmark.json
+
+Every (day, scale) case runs in a fresh process, so its peak RSS is not shared
+with other cases. The solvers run twice: once for wall time and RSS, once
+under tracemalloc for allocated memory, which would otherwise skew the times.
+
+RSS is recorded per stage: `rss_before_kb` when the stage starts, `peak_rss_kb`
+the highest RSS while it runs and `rss_growth_kb` the difference. On Linux the
+peak is reset before every stage through /proc/self/clear_refs. Elsewhere only
+the process high-water mark is available, so `peak_rss_kb` is cumulative and
+the growth only shows stages that raise it.
+"""
+import argparse
+import contextlib
+import datetime
+import functools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+from .days import list_days, load_day
+from .generators import GENERATORS
+
+
+def bench_day01(day, text, stage):
+    lines = text.splitlines(keepends=True)
+    stage('find_top_sums', day.find_top_sums, lines)
+
+
+def bench_day02(day, text, stage):
+    lines = text.splitlines(keepends=True)
+    stage('score_for_given_move', day.score_for_given_move, lines)
+    stage('score_for_given_result', day.score_for_given_result, lines)
+
+
+def bench_day03(day, text, stage):
+    lines = text.splitlines(keepends=True)
+    stage('find_rucksack_duplicates', day.find_rucksack_duplicates, lines)
+    stage('find_groups_common_element', day.find_groups_common_element, lines)
+
+
+def bench_day04(day, text, stage):
+    lines = text.splitlines(keepends=True)
+    stage('find_ranges(either_contains)', day.find_ranges, day.either_contains, lines)
+    stage('find_ranges(overlap)', day.find_ranges, day.overlap, lines)
+
+
+def bench_day05(day, text, stage):
+    stacks, moves = stage('read_input', day.read_input, text.splitlines(keepends=True))
+    stage('simulate', day.simulate, stacks, moves)
+
+
+def bench_day06(day, text, stage):
+    signal = text.strip()
+    stage('find_unique_window(4)', day.find_unique_window, signal, target_size=4)
+    stage('find_unique_window(14)', day.find_unique_window, signal, target_size=14)
+
+
+def bench_day07(day, text, stage):
+    tree = stage('build_fs_tree', day.build_fs_tree, text.splitlines(keepends=True))
+
+    def total_sizes():
+        return [node.total_size() for node in day.walk(tree) if node.is_dir()]
+
+    stage('total_size', total_sizes)
+
+
+def bench_day08(day, text, stage):
+    board = stage('read_board', day.read_board, text.splitlines(keepends=True))
+    stage('find_visible', day.find_visible, board)
+    stage('find_best_score', day.find_best_score, board)
+
+
+def bench_day09(day, text, stage):
+    lines = text.splitlines(keepends=True)
+    stage('simulate_moves(2)', day.simulate_moves, 2, lines)
+    stage('simulate_moves(10)', day.simulate_moves, 10, lines)
+
+
+def bench_day10(day, text, stage):
+    lines = text.splitlines(keepends=True)
+    stage('simulate_instructions_count', day.simulate_instructions_count, lines)
+
+    screen_lines = []
+    cycles = 0
+    for line in lines:
+        if cycles >= 240:
+            break
+        screen_lines.append(line)
+        cycles += 2 if line.startswith('addx') else 1
+    stage('simulate_instructions_draw', day.simulate_instructions_draw, screen_lines)
+
+
+def bench_day11(day, text, stage):
+    monkeys = stage('parse_input', day.parse_input, text.splitlines(keepends=True))
+    worry_mod = day.find_worry_mod(monkeys)
+
+    # The same operations on every starting item, interpreted and compiled.
+    items = [item for monkey in monkeys for item in monkey.items]
+
+    def apply_all(operations, repeat):
+        for i in range(repeat):
+            for operation in operations:
+                for item in items:
+                    operation(item)
+
+    def interpret(expr):
+        return lambda old: expr.evaluate(dict(old=old))
+
+    interpreted = [interpret(monkey.operation_expr) for monkey in monkeys]
+    stage('BinOp.evaluate x1000', apply_all, interpreted, repeat=1000)
+    compiled = stage('compile', lambda: [monkey.operation for monkey in monkeys])
+    stage('compiled operation x1000', apply_all, compiled, repeat=1000)
+
+    stage('simulate_throws_by_item', day.simulate_throws_by_item, monkeys,
+          rounds=10000, worry_mod=worry_mod, workers=1)
+    stage('simulate_throws_by_item(1000000000)', day.simulate_throws_by_item, monkeys,
+          rounds=1000000000, worry_mod=worry_mod, workers=1)
+    stage('simulate_throws_vectorized', day.simulate_throws_vectorized, monkeys,
+          rounds=10000, worry_mod=worry_mod)
+    stage('simulate_throws', day.simulate_throws, monkeys, rounds=10000, worry_mod=worry_mod)
+
+
+def bench_day12(day, text, stage):
+    board, start, end = stage('read_board', day.read_board, text.splitlines(keepends=True))
+    stage('find_path', day.find_path, board, start, end)
+    stage('find_shortest', day.find_shortest, board, end)
+
+
+def bench_day13(day, text, stage):
+    lines = text.splitlines(keepends=True)
+    stage('load_packet_pairs', day.load_packet_pairs, lines)
+    packets = stage('load_packets', day.load_packets, lines)
+    stage('compare_packets', sorted, packets, key=functools.cmp_to_key(day.compare_packets))
+
+
+def bench_day14(day, text, stage):
+    structures = stage('read_structures', day.read_structures, text.splitlines(keepends=True))
+    max_y = day.find_max_y(structures)
+    stage('count_sand_with_floor', day.count_sand_with_floor, structures, ground=max_y + 2)
+    bottom = stage('find_bottom', day.find_bottom, structures, ground=max_y + 2)
+    cave = stage('make_cave', day.make_cave, bottom)
+    stage('fill_cave', day.fill_cave, cave, structures)
+    stage('drop_sand', day.drop_sand, cave)
+    board = stage('make_board', day.make_board, bottom)
+    stage('fill_board', day.fill_board, board, structures)
+    stage('simulate_falling', day.simulate_falling, board)
+
+
+def bench_day15(day, text, stage):
+    sensors, beacons = stage('read_map', day.read_map, text.splitlines(keepends=True))
+    sensors.sort(key=lambda s: s.detect_range, reverse=True)
+    stage('find_covered_at_y', day.find_covered_at_y, sensors, target_y=2000000)
+    stage('count_covered_at_ys(100000 rows)', day.count_covered_at_ys, sensors,
+          range(1950000, 2050000), beacons)
+    stage('find_uncovered_by_edges', day.find_uncovered_by_edges, sensors, 0, 4000000, 0, 4000000)
+
+
+def bench_day16(day, text, stage):
+    nodes = stage('read_map', day.read_map, text.splitlines(keepends=True))
+    stage('make_connection_matrix', day.make_connection_matrix, nodes)
+    matrix = stage('make_distance_matrix', day.make_distance_matrix, nodes)
+    stage('find_best_route(1)', day.find_best_route,
+          nodes, matrix, start='AA', time_limit=30, actor_num=1)
+    stage('find_best_route(2)', day.find_best_route,
+          nodes, matrix, start='AA', time_limit=26, actor_num=2)
+
+
+def bench_day17(day, text, stage):
+    moves = stage('read_moves', day.read_moves, text.strip())
+    shapes = day.make_shapes()
+    stage('simulate_packed(2022)', day.simulate_packed, shapes, moves, block_num=2022)
+    stage('simulate_packed(1000000000000)', day.simulate_packed, shapes, moves,
+          block_num=1000000000000)
+    stage('simulate_packed(100000, no cycles)', day.simulate_packed, shapes, moves,
+          block_num=100000, detect_cycles=False)
+
+    stage('simulate(2022)', day.simulate, day.Board(width=7), shapes, moves,
+          block_num=2022, signature_size=0)
+    # The board's cycle search takes close to a minute already at scale 1.
+    if len(moves) <= 10 * 10091:
+        stage('simulate(1000000000000)', day.simulate, day.Board(width=7), shapes, moves,
+              block_num=1000000000000, signature_size=3000)
+
+
+def bench_day18(day, text, stage):
+    blocks = stage('read_blocks', day.read_blocks, text.splitlines(keepends=True))
+    stage('calculate_surface_area', day.calculate_surface_area, blocks)
+
+
+def bench_day19(day, text, stage):
+    blueprints = stage('read_blueprints', day.read_blueprints, text.splitlines(keepends=True))
+
+    def calculate_all(blueprints, time_limit):
+        return [day.calculate_max_geodes(blueprint, time_limit=time_limit)
+                for blueprint in blueprints]
+
+    stage('calculate_max_geodes(24)', calculate_all, blueprints, time_limit=24)
+    stage('calculate_max_geodes(32)', calculate_all, blueprints[:3], time_limit=32)
+
+    # The pruned search must agree with the exhaustive one where that is cheap.
+    cheap, = day.read_blueprints([
+        'Blueprint 1: Each ore robot costs 1 ore. Each clay robot costs 1 ore. '
+        'Each obsidian robot costs 1 ore and 1 clay. Each geode robot costs 1 ore and 1 obsidian.'
+    ])
+    for time_limit in (14, 24):
+        expected = stage(f'calculate_max_geodes_exhaustive({time_limit})',
+                         day.calculate_max_geodes_exhaustive, cheap, time_limit)
+        found = day.calculate_max_geodes(cheap, time_limit)
+        if found != expected:
+            raise ValueError(f'calculate_max_geodes({time_limit}) found {found} geodes, '
+                             f'the exhaustive search {expected}')
+
+
+def bench_day20(day, text, stage):
+    values = [int(line) * 811589153 for line in text.splitlines()]
+    mixed = stage('mix', day.mix, values, loops=10)
+    stage('find_mixed_grove_coordinates', day.find_mixed_grove_coordinates, mixed)
+
+    # The linked lists move every value one node at a time, which is quadratic
+    # and would use up the case timeout on the larger scales.
+    if len(values) > 20000:
+        return
+
+    nodes = stage('read_code', day.read_code, text.splitlines(keepends=True))
+    for node in nodes:
+        node.value *= 811589153
+
+    def reorder_loops(nodes, loops):
+        for i in range(loops):
+            day.reorder(nodes)
+
+    stage('reorder', reorder_loops, nodes, loops=10)
+    zero_node = stage('find', day.find, nodes, value=0)
+    stage('get_nth', day.get_nth, zero_node, 3000 % len(nodes))
+
+    code = stage('read_linked_code', day.read_linked_code, text.splitlines(keepends=True))
+    for i in range(len(code)):
+        code.values[i] *= 811589153
+
+    def reorder_linked_loops(code, loops):
+        for i in range(loops):
+            code.reorder()
+
+    stage('LinkedCode.reorder', reorder_linked_loops, code, loops=10)
+    stage('LinkedCode.find_grove_coordinates', code.find_grove_coordinates)
+
+
+def bench_day21(day, text, stage):
+    lines = text.splitlines(keepends=True)
+    monkeys = stage('read_input', day.read_input, alt_mode=False, lines=lines)
+    stage('evaluate', day.evaluate, monkeys)
+    program = stage('compile_monkeys', day.compile_monkeys, monkeys)
+    values = stage('Program.evaluate', program.evaluate)
+    stage('Program.reevaluate(humn)', program.reevaluate, values, {'humn': 0})
+    evaluator = stage('IncrementalEvaluator', day.IncrementalEvaluator, monkeys)
+    stage('IncrementalEvaluator.update(humn)', evaluator.update, {'humn': 0})
+    monkeys = stage('read_input(alt_mode)', day.read_input, alt_mode=True, lines=lines)
+    stage('evaluate(alt_mode)', day.evaluate, monkeys)
+    stage('solve_linear', day.solve_linear, monkeys)
+
+
+def bench_day22(day, text, stage):
+    fields, instructions = stage('read_input', day.read_input, text.splitlines(keepends=True))
+    size = day.guess_size(fields)
+    texture = stage('Texture', day.Texture, fields=fields, size=size)
+    board = day.Board(size=size, texture=texture)
+    position = board.first_position()
+    stage('simulate', day.simulate, board, position, instructions)
+
+
+def bench_day23(day, text, stage):
+    elves = stage('read_input', day.read_input, text.splitlines(keepends=True))
+    stage('simulate_dense(10)', day.simulate_dense, elves, rounds=10)
+    stage('simulate_dense(10000)', day.simulate_dense, elves, rounds=10000)
+    stage('simulate_frontier(10000)', day.simulate_frontier, elves, rounds=10000)
+    stage('simulate(10)', day.simulate, elves, rounds=10)
+    stage('simulate(10000)', day.simulate, elves, rounds=10000)
+
+
+def bench_day24(day, text, stage):
+    fields = stage('read_input', day.read_input, text.splitlines(keepends=True))
+    blizzards = stage('Blizzards.from_fields', day.Blizzards.from_fields, fields)
+    stage('find_trip_times_bits', day.find_trip_times_bits, blizzards)
+    planner = day.TripPlanner(blizzards)
+    waypoints = [(0, 0), (blizzards.height - 1, blizzards.width - 1)] * 2
+    stage('TripPlanner.plan', planner.plan, waypoints)
+    stage('TripPlanner.plan(again)', planner.plan, waypoints)
+    states = stage('generate_states', day.generate_states, fields)
+    stage('find_trip_times', day.find_trip_times, states)
+
+
+def bench_day25(day, text, stage):
+    codes = text.split()
+    nums = stage('code_to_num', lambda: [day.code_to_num(code) for code in codes])
+    stage('num_to_code', day.num_to_code, sum(nums))
+
+
+BENCHMARKS = {
+    int(name[len('bench_day'):]): bench
+    for name, bench in list(globals().items())
+    if name.startswith('bench_day')
+}
+
+
+def read_rss_kb():
+    """Current RSS and peak RSS since the last reset, in KB."""
+    try:
+        with open('/proc/self/status') as f:
+            status = dict(line.split(':', 1) for line in f)
+        return int(status['VmRSS'].split()[0]), int(status['VmHWM'].split()[0])
+    except OSError:
+        max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss_kb, max_rss_kb
+
+
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+class Recorder:
+    def __init__(self, connection, trace_allocations):
+        self.connection = connection
+        self.trace_allocations = trace_allocations
+        self.stage_num = 0
+
+    def __call__(self, name, function, *args, **kwargs):
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            result = function(*args, **kwargs)
+            after, peak = tracemalloc.get_traced_memory()
+            record = dict(
+                name=name,
+                alloc_peak_bytes=peak - before,
+                alloc_net_bytes=after - before,
+            )
+        else:
+            reset_peak_rss()
+            rss_before_kb, _ = read_rss_kb()
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            wall_s = time.perf_counter() - start
+            _, peak_rss_kb = read_rss_kb()
+            record = dict(
+                name=name,
+                wall_s=wall_s,
+                rss_before_kb=rss_before_kb,
+                peak_rss_kb=peak_rss_kb,
+                rss_growth_kb=peak_rss_kb - rss_before_kb,
+            )
+
+        self.connection.send(('stage', (self.stage_num, record)))
+        self.stage_num += 1
+        return result
+
+
+def run_case(day_num, scale, seed, trace_allocations, connection):
+    try:
+        day = load_day(day_num)
+        rng = random.Random(f'{day_num}:{scale}:{seed}')
+        text = GENERATORS[day_num](rng, scale)
+        connection.send(('input', len(text)))
+
+        bench = BENCHMARKS[day_num]
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            bench(day, text, Recorder(connection, trace_allocations=False))
+            if trace_allocations:
+                tracemalloc.start()
+                try:
+                    bench(day, text, Recorder(connection, trace_allocations=True))
+                finally:
+                    tracemalloc.stop()
+    except Exception as e:
+        connection.send(('error', f'{type(e).__name__}: {e}'))
+    else:
+        connection.send(('done', None))
+    finally:
+        connection.close()
+
+
+def benchmark_case(day_num, scale, seed, timeout, trace_allocations):
+    case = dict(day=day_num, scale=scale, input_bytes=None, status='timeout', stages=[])
+
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=run_case, args=(day_num, scale, seed, trace_allocations, sender)
+    )
+    process.start()
+    sender.close()
+
+    deadline = time.monotonic() + timeout
+    try:
+        while receiver.poll(max(0, deadline - time.monotonic())):
+            kind, payload = receiver.recv()
+            if kind == 'input':
+                case['input_bytes'] = payload
+            elif kind == 'stage':
+                # The traced pass repeats the stages in the same order.
+                stage_num, record = payload
+                if stage_num < len(case['stages']):
+                    case['stages'][stage_num].update(record)
+                else:
+                    case['stages'].append(record)
+            elif kind == 'error':
+                case['status'] = 'error'
+                case['error'] = payload
+                break
+            elif kind == 'done':
+                case['status'] = 'ok'
+                break
+    except EOFError:
+        case['status'] = 'error'
+        case['error'] = f'worker exited with code {process.exitcode}'
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+
+    return case
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, nargs='+', default=list_days())
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=600,
+                        help='seconds allowed for a single (day, scale) case')
+    parser.add_argument('--no-allocations', action='store_true',
+                        help='skip the tracemalloc pass')
+    parser.add_argument('--output', default='benchmark.json')
+    args = parser.parse_args()
+
+    report = dict(
+        created=datetime.datetime.now().isoformat(timespec='seconds'),
+        python=sys.version.split()[0],
+        platform=platform.platform(),
+        seed=args.seed,
+        cases=[],
+    )
+
+    for day_num in args.days:
+        for scale in args.scales:
+            case = benchmark_case(
+                day_num, scale, seed=args.seed, timeout=args.timeout,
+                trace_allocations=not args.no_allocations,
+            )
+            report['cases'].append(case)
+
+            wall_s = sum(stage.get('wall_s', 0) for stage in case['stages'])
+            print(f"day {day_num:02d} x{scale:g}: {case['status']} "
+                  f"({case['input_bytes']} bytes, {wall_s:.3f}s)", flush=True)
+
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
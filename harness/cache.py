@@ -0,0 +1,101 @@
+"""On-disk cache of solver answers.
+
+Answers are stored per (day, part, SHA-256 of the input bytes, solver version)
+in a single sqlite file. When the cache grows over `max_entries`, the least
+recently used answers are dropped.
+
+A stored answer can be None, so `get` tells a missing one apart by returning
+`default`, e.g. `MISSING`. Hits and misses are counted by the caller, which
+knows whether the cached answers were actually used.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+
+
+MISSING = object()
+
+
+def hash_input(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path, max_entries=10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS results (
+                day INTEGER NOT NULL,
+                part INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (day, part, digest, version)
+            );
+            CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+        ''')
+
+    def get(self, day, part, digest, version, default=None):
+        key = (day, part, digest, version)
+        row = self.connection.execute(
+            'SELECT value FROM results WHERE day = ? AND part = ? AND digest = ? AND version = ?',
+            key,
+        ).fetchone()
+        if row is None:
+            return default
+
+        self.connection.execute(
+            'UPDATE results SET last_used = ? '
+            'WHERE day = ? AND part = ? AND digest = ? AND version = ?',
+            (time.time_ns(),) + key,
+        )
+        return json.loads(row[0])
+
+    def put(self, day, part, digest, version, value):
+        # Answers that JSON has no type for, like a Fraction, are stored the
+        # way the runner prints them. Ones that cannot be encoded at all, like
+        # ints too long for str(), are not stored.
+        try:
+            encoded = json.dumps(value, default=str)
+        except (TypeError, ValueError):
+            return False
+        self.connection.execute(
+            'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+            (day, part, digest, version, encoded, time.time_ns()),
+        )
+        self.evict()
+        self.connection.commit()
+        return True
+
+    def evict(self):
+        size, = self.connection.execute('SELECT COUNT(*) FROM results').fetchone()
+        if size <= self.max_entries:
+            return
+        self.connection.execute(
+            'DELETE FROM results WHERE rowid IN '
+            '(SELECT rowid FROM results ORDER BY last_used LIMIT ?)',
+            (size - self.max_entries,),
+        )
+
+    def count(self, name, amount=1):
+        setattr(self, name, getattr(self, name) + amount)
+        self.connection.execute(
+            'INSERT INTO stats VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET value = value + ?',
+            (name, amount, amount),
+        )
+
+    def total_stats(self):
+        return dict(self.connection.execute('SELECT name, value FROM stats'))
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
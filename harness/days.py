@@ -0,0 +1,36 @@
+import hashlib
+import importlib.util
+import pathlib
+import sys
+
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+def find_day_dir(day):
+    matches = sorted(ROOT.glob(f'{day:02d}_*/main.py'))
+    if not matches:
+        raise ValueError(f'No solver found for day {day}')
+    return matches[0].parent
+
+
+def list_days():
+    return sorted(int(path.parent.name[:2]) for path in ROOT.glob('[0-9][0-9]_*/main.py'))
+
+
+def load_day(day):
+    module_name = f'day{day:02d}'
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    path = find_day_dir(day) / 'main.py'
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def solver_version(day):
+    source = (find_day_dir(day) / 'main.py').read_bytes()
+    return hashlib.sha256(source).hexdigest()[:16]
@@ -0,0 +1,481 @@
+"""Synthetic puzzle inputs, one generator per day.
+
+Every generator takes a `random.Random` and a scale factor and returns the
+input text. A scale of 1 produces roughly the size of the day's `input-01.txt`
+(or the real input where that file is only an example), larger scales grow the
+dimension that the day's solvers iterate over.
+"""
+import itertools
+import string
+
+
+def scaled(base, scale):
+    return max(1, round(base * scale))
+
+
+def scaled_side(base, scale, dims=2):
+    return max(1, round(base * scale ** (1 / dims)))
+
+
+def generate_day01(rng, scale):
+    lines = []
+    for elf in range(scaled(250, scale)):
+        for item in range(rng.randint(1, 15)):
+            lines.append(str(rng.randint(1000, 60000)))
+        lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day02(rng, scale):
+    lines = [f'{rng.choice("ABC")} {rng.choice("XYZ")}'
+             for i in range(scaled(2500, scale))]
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day03(rng, scale):
+    letters = string.ascii_letters
+    lines = []
+    for group in range(scaled(100, scale)):
+        pool = list(letters)
+        rng.shuffle(pool)
+        badge, pool = pool[0], pool[1:]
+        for i in range(3):
+            own = pool[i * 17:(i + 1) * 17]
+            duplicate, left_pool, right_pool = own[0], own[1:9], own[9:]
+            half = rng.randint(8, 16)
+            left = [duplicate] + rng.choices(left_pool, k=half - 1)
+            right = [duplicate] + rng.choices(right_pool, k=half - 1)
+            side = left if rng.random() < 0.5 else right
+            side[rng.randrange(1, half)] = badge
+            rng.shuffle(left)
+            rng.shuffle(right)
+            lines.append(''.join(left + right))
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day04(rng, scale):
+    lines = []
+    for i in range(scaled(1000, scale)):
+        a_start, a_end = sorted(rng.randint(1, 99) for j in range(2))
+        b_start, b_end = sorted(rng.randint(1, 99) for j in range(2))
+        lines.append(f'{a_start}-{a_end},{b_start}-{b_end}')
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day05(rng, scale):
+    stack_num = 9
+    stacks = [[rng.choice(string.ascii_uppercase)
+               for j in range(rng.randint(1, scaled(8, scale)))]
+              for i in range(stack_num)]
+
+    height = max(len(stack) for stack in stacks)
+    lines = []
+    for level in range(height - 1, -1, -1):
+        cells = [f'[{stack[level]}]' if level < len(stack) else '   '
+                 for stack in stacks]
+        lines.append(' '.join(cells).rstrip())
+    lines.append(' '.join(f' {i + 1} ' for i in range(stack_num)).rstrip())
+    lines.append('')
+
+    for move in range(scaled(500, scale)):
+        src = rng.choice([i for i, stack in enumerate(stacks) if stack])
+        dst = rng.choice([i for i in range(stack_num) if i != src])
+        size = rng.randint(1, min(len(stacks[src]), 30))
+        stacks[dst].extend(stacks[src][-size:])
+        del stacks[src][-size:]
+        lines.append(f'move {size} from {src + 1} to {dst + 1}')
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day06(rng, scale):
+    noise = rng.choices('abc', k=scaled(4096, scale) - 14)
+    return ''.join(noise) + string.ascii_lowercase[-14:] + '\n'
+
+
+def generate_day07(rng, scale):
+    lines = ['$ cd /']
+    budget = [scaled(1000, scale)]
+
+    def visit(depth):
+        lines.append('$ ls')
+        dir_names = []
+        for i in range(rng.randint(1, 6)):
+            if depth < 12 and budget[0] > 0 and rng.random() < 0.4:
+                name = f'd{len(lines)}'
+                dir_names.append(name)
+                lines.append(f'dir {name}')
+            else:
+                lines.append(f'{rng.randint(1000, 300000)} f{len(lines)}.txt')
+            budget[0] -= 1
+        for name in dir_names:
+            lines.append(f'$ cd {name}')
+            visit(depth + 1)
+            lines.append('$ cd ..')
+
+    while budget[0] > 0:
+        lines.append('$ cd /')
+        visit(0)
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day08(rng, scale):
+    side = scaled_side(99, scale)
+    lines = [''.join(rng.choices(string.digits, k=side)) for y in range(side)]
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day09(rng, scale):
+    lines = [f'{rng.choice("RLUD")} {rng.randint(1, 20)}'
+             for i in range(scaled(2000, scale))]
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day10(rng, scale):
+    # Every block is a full 240-cycle screen, the drawing solver only handles one.
+    lines = []
+    for block in range(scaled(1, scale)):
+        cycles = 0
+        while cycles < 240:
+            if cycles < 239 and rng.random() < 0.6:
+                lines.append(f'addx {rng.randint(-20, 20)}')
+                cycles += 2
+            else:
+                lines.append('noop')
+                cycles += 1
+    return '\n'.join(lines) + '\n'
+
+
+PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]
+
+
+def generate_day11(rng, scale):
+    # Like the real input, one monkey squares and two multiply. Without relief
+    # an item that keeps coming back to the squaring monkey grows without
+    # bound, so none of the monkeys it throws to throw straight back.
+    monkey_num = 8
+    divisors = rng.sample(PRIMES, monkey_num)
+    operations = ['old * old'] + [f'old * {rng.randint(2, 19)}' for _ in range(2)]
+    operations += [f'old + {rng.randint(1, 8)}' for _ in range(monkey_num - len(operations))]
+    rng.shuffle(operations)
+    squaring = operations.index('old * old')
+
+    targets = [None] * monkey_num
+    targets[squaring] = rng.sample([j for j in range(monkey_num) if j != squaring], 2)
+    for i in range(monkey_num):
+        if targets[i] is None:
+            excluded = {i, squaring} if i in targets[squaring] else {i}
+            targets[i] = rng.sample([j for j in range(monkey_num) if j not in excluded], 2)
+
+    chunks = []
+    for i in range(monkey_num):
+        items = [str(rng.randint(50, 99)) for j in range(scaled(4, scale))]
+        chunks.append(
+            f'Monkey {i}:\n'
+            f'  Starting items: {", ".join(items)}\n'
+            f'  Operation: new = {operations[i]}\n'
+            f'  Test: divisible by {divisors[i]}\n'
+            f'    If true: throw to monkey {targets[i][0]}\n'
+            f'    If false: throw to monkey {targets[i][1]}\n'
+        )
+    return '\n'.join(chunks)
+
+
+def generate_day12(rng, scale):
+    height = scaled_side(41, scale)
+    width = max(26, scaled_side(162, scale))
+    letters = string.ascii_lowercase
+
+    rows = []
+    for y in range(height):
+        row = []
+        for x in range(width):
+            base = x * 25 // (width - 1)
+            if y == 0 or x == 0 or x == width - 1:
+                value = base
+            else:
+                value = min(25, max(0, base + rng.randint(-3, 1)))
+            row.append(letters[value])
+        rows.append(row)
+    rows[height // 2][0] = 'S'
+    rows[height // 2][-1] = 'E'
+    return '\n'.join(''.join(row) for row in rows) + '\n'
+
+
+def generate_packet(rng, depth=0):
+    if depth >= 4 or rng.random() < 0.3:
+        return rng.randint(0, 10)
+    return [generate_packet(rng, depth + 1) for i in range(rng.randint(0, 5))]
+
+
+def format_packet(packet):
+    if isinstance(packet, int):
+        return str(packet)
+    return '[' + ','.join(format_packet(item) for item in packet) + ']'
+
+
+def generate_day13(rng, scale):
+    chunks = []
+    for i in range(scaled(150, scale)):
+        left = [generate_packet(rng, 1) for j in range(rng.randint(0, 5))]
+        right = [generate_packet(rng, 1) for j in range(rng.randint(0, 5))]
+        chunks.append(f'{format_packet(left)}\n{format_packet(right)}\n')
+    return '\n'.join(chunks)
+
+
+def generate_day14(rng, scale):
+    depth = scaled_side(170, scale)
+    lines = []
+    for i in range(scaled(147, scale)):
+        x = rng.randint(500 - depth, 500 + depth)
+        y = rng.randint(13, depth)
+        points = [(x, y)]
+        for j in range(rng.randint(1, 6)):
+            if j % 2 == 0:
+                x = max(1, x + rng.choice([-1, 1]) * rng.randint(1, 10))
+            else:
+                y = min(depth, max(13, y + rng.choice([-1, 1]) * rng.randint(1, 10)))
+            points.append((x, y))
+        lines.append(' -> '.join(f'{x},{y}' for x, y in points))
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day15(rng, scale):
+    # Every sensor range ends right before a hidden point, so part two always
+    # has an uncovered candidate in [0, 4000000]^2.
+    limit = 4000000
+    hidden_x, hidden_y = rng.randint(0, limit), rng.randint(0, limit)
+    lines = []
+    for i in range(scaled(23, scale)):
+        x, y = rng.randint(0, limit), rng.randint(0, limit)
+        detect_range = max(1, abs(x - hidden_x) + abs(y - hidden_y) - 1)
+        dx = rng.randint(-detect_range, detect_range)
+        dy = (detect_range - abs(dx)) * rng.choice([-1, 1])
+        lines.append(f'Sensor at x={x}, y={y}: '
+                     f'closest beacon is at x={x + dx}, y={y + dy}')
+    return '\n'.join(lines) + '\n'
+
+
+def make_names(count, letters=string.ascii_uppercase, min_len=2):
+    names = []
+    for length in itertools.count(min_len):
+        for chars in itertools.product(letters, repeat=length):
+            names.append(''.join(chars))
+            if len(names) == count:
+                return names
+
+
+def generate_day16(rng, scale):
+    # Like the real input: the valves worth opening are two or three tunnels
+    # apart, joined by corridors of broken valves. Only the graph grows with
+    # the scale, as dead ends off the corridors, so the distances between the
+    # valves worth opening stay the same.
+    room_num = 16
+    corridors = set()
+    for i in range(1, room_num):
+        corridors.add((rng.randrange(i), i))
+    while len(corridors) < 2 * (room_num - 1):
+        a, b = sorted(rng.sample(range(room_num), 2))
+        corridors.add((a, b))
+    corridors = [(a, b, rng.randint(1, 2)) for a, b in sorted(corridors)]
+
+    corridor_valve_num = sum(length for _, _, length in corridors)
+    valve_num = max(room_num + corridor_valve_num, scaled(61, scale))
+    names = make_names(valve_num)
+    rng.shuffle(names)
+    names.remove('AA')
+    names.insert(0, 'AA')
+
+    neighbors = {name: set() for name in names}
+
+    def connect(a, b):
+        neighbors[a].add(b)
+        neighbors[b].add(a)
+
+    broken = names[room_num:room_num + corridor_valve_num]
+    for a, b, length in corridors:
+        path = [names[a]] + [broken.pop() for _ in range(length)] + [names[b]]
+        for prev_name, name in zip(path, path[1:]):
+            connect(prev_name, name)
+
+    dead_ends = names[room_num:room_num + corridor_valve_num]
+    for name in names[room_num + corridor_valve_num:]:
+        connect(name, rng.choice(dead_ends))
+        dead_ends.append(name)
+
+    flows = dict.fromkeys(names, 0)
+    for name in names[1:room_num]:
+        flows[name] = rng.randint(3, 25)
+
+    lines = []
+    for name in names:
+        targets = sorted(neighbors[name])
+        if len(targets) == 1:
+            tunnels = f'tunnel leads to valve {targets[0]}'
+        else:
+            tunnels = f'tunnels lead to valves {", ".join(targets)}'
+        lines.append(f'Valve {name} has flow rate={flows[name]}; {tunnels}')
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day17(rng, scale):
+    return ''.join(rng.choices('<>', k=scaled(10091, scale))) + '\n'
+
+
+def generate_day18(rng, scale):
+    side = scaled_side(20, scale, dims=3)
+    count = min(side ** 3, scaled(2686, scale))
+    cells = rng.sample(range(side ** 3), count)
+    lines = [f'{cell // side ** 2 + 1},{cell // side % side + 1},{cell % side + 1}'
+             for cell in cells]
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day19(rng, scale):
+    lines = []
+    for i in range(scaled(30, scale)):
+        lines.append(
+            f'Blueprint {i + 1}: '
+            f'Each ore robot costs {rng.randint(2, 4)} ore. '
+            f'Each clay robot costs {rng.randint(2, 4)} ore. '
+            f'Each obsidian robot costs {rng.randint(2, 4)} ore '
+            f'and {rng.randint(5, 20)} clay. '
+            f'Each geode robot costs {rng.randint(2, 4)} ore '
+            f'and {rng.randint(5, 20)} obsidian.'
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day20(rng, scale):
+    values = [rng.randint(-10000, 10000) or 1 for i in range(scaled(5000, scale))]
+    values[rng.randrange(len(values))] = 0
+    return '\n'.join(map(str, values)) + '\n'
+
+
+def pick_operation(rng, value):
+    op = rng.choice('+-*/')
+    if op == '+':
+        b_value = rng.randint(0, value)
+        a_value = value - b_value
+    elif op == '-':
+        b_value = rng.randint(0, 1000)
+        a_value = value + b_value
+    elif op == '*':
+        b_value = next(d for d in (7, 5, 3, 2, 1) if value % d == 0)
+        a_value = value // b_value
+    else:
+        b_value = rng.randint(1, 5)
+        a_value = value * b_value
+    return op, a_value, b_value
+
+
+def generate_day21(rng, scale):
+    # Root compares two subtrees of equal value, so the generated humn value is
+    # the answer to part two and every division on the way is exact.
+    monkey_num = max(5, scaled(2400, scale))
+    names = make_names(monkey_num, letters=string.ascii_lowercase, min_len=4)
+    if len(names[-1]) != 4:
+        raise ValueError(f'{monkey_num} monkeys do not fit into 4-letter names')
+    names = [name for name in names if name not in ('root', 'humn')]
+    rng.shuffle(names)
+    lines = []
+
+    def build(name, value, budget):
+        if budget < 3:
+            lines.append(f'{name}: {value}')
+            return
+        op, a_value, b_value = pick_operation(rng, value)
+        a_name, b_name = names.pop(), names.pop()
+        lines.append(f'{name}: {a_name} {op} {b_name}')
+        a_budget = rng.randint(1, budget - 2)
+        build(a_name, a_value, a_budget)
+        build(b_name, b_value, budget - 1 - a_budget)
+
+    def build_humn_chain(name, value, budget):
+        op, a_value, b_value = pick_operation(rng, value)
+        b_budget = max(1, (budget - 1) // 8)
+        a_budget = budget - 1 - b_budget
+        a_name = names.pop() if a_budget >= 3 else 'humn'
+        b_name = names.pop()
+        lines.append(f'{name}: {a_name} {op} {b_name}')
+        if a_name == 'humn':
+            lines.append(f'humn: {a_value}')
+        else:
+            build_humn_chain(a_name, a_value, a_budget)
+        build(b_name, b_value, b_budget)
+
+    root_value = rng.randint(10 ** 6, 10 ** 9)
+    left_budget = (monkey_num - 1) // 2
+    left_name, right_name = names.pop(), names.pop()
+    lines.append(f'root: {left_name} + {right_name}')
+    build(left_name, root_value, left_budget)
+    build_humn_chain(right_name, root_value, monkey_num - 1 - left_budget)
+
+    rng.shuffle(lines)
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day22(rng, scale):
+    size = scaled_side(50, scale)
+    # Same net as the real input: two faces on top, then one, two and one.
+    faces = [(0, 1), (0, 2), (1, 1), (2, 0), (2, 1), (3, 0)]
+    grid = [[' '] * (3 * size) for y in range(4 * size)]
+    for face_y, face_x in faces:
+        for y in range(face_y * size, (face_y + 1) * size):
+            for x in range(face_x * size, (face_x + 1) * size):
+                grid[y][x] = '#' if rng.random() < 0.03 else '.'
+    grid[0][size] = '.'
+    lines = [''.join(row).rstrip() for row in grid]
+
+    instructions = [str(rng.randint(1, size))]
+    for i in range(scaled(2000, scale)):
+        instructions.append(rng.choice('RL'))
+        instructions.append(str(rng.randint(1, size)))
+    lines.append('')
+    lines.append(''.join(instructions))
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day23(rng, scale):
+    side = scaled_side(70, scale)
+    lines = [''.join('#' if rng.random() < 0.5 else '.' for x in range(side))
+             for y in range(side)]
+    return '\n'.join(lines) + '\n'
+
+
+def generate_day24(rng, scale):
+    height = scaled_side(25, scale)
+    width = scaled_side(120, scale)
+    lines = ['#.' + '#' * width]
+    for y in range(height):
+        row = [rng.choice('><^v') if rng.random() < 0.7 else '.' for x in range(width)]
+        if y == 0:
+            row[0] = '.'
+        if y == height - 1:
+            row[-1] = '.'
+        lines.append('#' + ''.join(row) + '#')
+    lines.append('#' * width + '.#')
+    return '\n'.join(lines) + '\n'
+
+
+SNAFU_DIGITS = '=-012'
+
+
+def to_snafu(num):
+    digits = []
+    while num:
+        num, digit = divmod(num + 2, 5)
+        digits.append(SNAFU_DIGITS[digit])
+    return ''.join(reversed(digits)) or '0'
+
+
+def generate_day25(rng, scale):
+    lines = [to_snafu(rng.randint(1, 10 ** rng.randint(1, 15)))
+             for i in range(scaled(118, scale))]
+    return '\n'.join(lines) + '\n'
+
+
+GENERATORS = {
+    int(name[len('generate_day'):]): generator
+    for name, generator in list(globals().items())
+    if name.startswith('generate_day')
+}
@@ -0,0 +1,109 @@
+"""Solve a directory of puzzle inputs for one day in a pool of worker processes.
+
+    python -m harness.runner 16 inputs/day16/ > results.jsonl
+
+Every input file produces one JSON line with both answers. Lines are written in
+input order as soon as the chunk containing them is done. Answers already in
+the result cache are not solved again.
+"""
+import argparse
+import concurrent.futures
+import functools
+import json
+import os
+import pathlib
+import sys
+import time
+
+from .cache import MISSING, ResultCache, hash_input
+from .days import load_day, solver_version
+
+
+def solve_file(day_num, path):
+    start = time.perf_counter()
+    try:
+        text = pathlib.Path(path).read_text()
+        part1, part2 = load_day(day_num).solve(text)
+    except Exception as e:
+        return dict(day=day_num, input=str(path), error=f'{type(e).__name__}: {e}')
+    seconds = time.perf_counter() - start
+    return dict(day=day_num, input=str(path), part1=part1, part2=part2, seconds=seconds)
+
+
+def lookup_cached(cache, day_num, version, path):
+    digest = hash_input(pathlib.Path(path).read_bytes())
+    part1 = cache.get(day_num, 1, digest, version, default=MISSING)
+    part2 = cache.get(day_num, 2, digest, version, default=MISSING)
+    if part1 is MISSING or part2 is MISSING:
+        # Both parts are solved again, so neither cached answer is used.
+        cache.count('misses', 2)
+        return digest, None
+    cache.count('hits', 2)
+    return digest, dict(day=day_num, input=str(path), part1=part1, part2=part2, cached=True)
+
+
+def run_batch(day_num, paths, workers=None, chunksize=None, cache=None):
+    version = solver_version(day_num)
+    digests = {}
+    cached = {}
+    if cache is not None:
+        for path in paths:
+            digests[path], result = lookup_cached(cache, day_num, version, path)
+            if result is not None:
+                cached[path] = result
+    pending = [path for path in paths if path not in cached]
+
+    workers = workers or os.cpu_count()
+    if chunksize is None:
+        chunksize = max(1, len(pending) // (workers * 4))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        solved = executor.map(
+            functools.partial(solve_file, day_num), pending, chunksize=chunksize
+        )
+        for path in paths:
+            if path in cached:
+                yield cached[path]
+                continue
+
+            result = next(solved)
+            if cache is not None and 'error' not in result:
+                cache.put(day_num, 1, digests[path], version, result['part1'])
+                cache.put(day_num, 2, digests[path], version, result['part2'])
+            yield result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('day', type=int)
+    parser.add_argument('directory')
+    parser.add_argument('--pattern', default='*', help='glob for input files in the directory')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=None)
+    parser.add_argument('--cache', default='.solver-cache.sqlite')
+    parser.add_argument('--cache-size', type=int, default=10000,
+                        help='maximum number of cached answers')
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache, max_entries=args.cache_size)
+
+    paths = sorted(path for path in pathlib.Path(args.directory).glob(args.pattern)
+                   if path.is_file())
+    try:
+        for result in run_batch(args.day, paths, workers=args.workers,
+                                chunksize=args.chunksize, cache=cache):
+            print(json.dumps(result, default=str), flush=True)
+    finally:
+        if cache is not None:
+            total = cache.total_stats()
+            print(f'cache: {cache.hits} hits, {cache.misses} misses '
+                  f'(all time: {total.get("hits", 0)} hits, {total.get("misses", 0)} misses)',
+                  file=sys.stderr)
+            cache.close()
+
+
+if __name__ == '__main__':
+    main()